@@ -5,6 +5,19 @@ from typing import Literal
 class Settings(BaseSettings):
     app_name: str = "Budget App"
     database_url: str = "sqlite:///./budget.db"
+
+    # SQLite connection profile, applied to every new connection
+    sqlite_journal_mode: Literal["wal", "delete"] = "wal"  # WAL lets readers run alongside the writer
+    sqlite_synchronous: Literal["off", "normal", "full"] = "normal"  # NORMAL is durable enough under WAL
+    sqlite_busy_timeout_ms: int = 5000  # Wait this long for a lock instead of failing with "database is locked"
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size_kb: int = 64 * 1024  # Page cache per connection
+    db_pool_size: int = 20
+    db_max_overflow: int = 20  # Pool size plus overflow matches the threadpool's 40 workers
+    db_pool_timeout_seconds: float = 30.0
+    # Serve GET routes from a separate read-only engine and pool, so reads
+    # never wait on a connection the writers hold
+    database_read_engine: bool = False
     secret_key: str = "change-this-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 60 * 24 * 7  # 1 week
@@ -14,6 +27,56 @@ class Settings(BaseSettings):
     exchange_rate_provider: Literal["static", "frankfurter", "exchangerate-api"] = "frankfurter"
     exchange_rate_api_key: str | None = None  # Required for exchangerate-api
     exchange_rate_cache_minutes: int = 60  # Cache duration in minutes
+    exchange_rate_timeout_seconds: float = 10.0
+    # Frankfurter-compatible API, also used for historical backfills (point it
+    # at app.services.mock_rate_server to work offline)
+    frankfurter_url: str = "https://api.frankfurter.app"
+    # Fetch only this base and derive the other pairs from it (one upstream
+    # request per refresh); None fetches every supported base
+    exchange_rate_pivot_currency: str | None = None
+    # Refresh in the background ahead of expiry so requests never wait on the provider
+    exchange_rate_background_refresh: bool = True
+    # How often a worker checks the shared snapshot for rates another worker
+    # fetched (0 checks on every lookup)
+    exchange_rate_sync_seconds: float = 1.0
+
+    # Bank provider: "mock" generates transactions in-process, "http" talks to
+    # bank_provider_url (e.g. the stand-in server in app.services.mock_bank_server)
+    bank_provider: Literal["mock", "http"] = "mock"
+    bank_provider_url: str = "http://localhost:8001"
+    bank_provider_timeout_seconds: float = 10.0
+    bank_provider_max_retries: int = 3
+    bank_provider_page_size: int = 100
+    bank_provider_max_connections: int = 20
+
+    # Duplicate detection: rows with the same amount and description within
+    # this many days of each other are flagged as likely duplicates
+    duplicate_window_days: int = 3
+
+    # Learned merchant->category model: merchant tokens kept in memory
+    merchant_model_cache_size: int = 10000
+
+    # Maintenance job: processed pending transactions older than the retention
+    # are compacted to dedup keys, then freed pages are vacuumed incrementally
+    maintenance_interval_minutes: int = 24 * 60  # 0 disables the background job
+    pending_retention_days: int = 30
+    maintenance_vacuum_pages: int = 1000
+    balance_raw_retention_days: int = 30  # Then downsampled to daily
+    balance_daily_retention_days: int = 365  # Then downsampled to monthly
+    import_staging_retention_hours: int = 24  # Unconfirmed CSV imports are discarded after this
+    csv_parallel_workers: int = 0  # Processes validating large CSV uploads, 0 = one per CPU
+    csv_parallel_min_bytes: int = 8 * 1024 * 1024  # Smaller uploads are validated in-process
+
+    # Cached categories and user settings are checked for changes made by
+    # other worker processes at most this often
+    reference_cache_check_seconds: float = 1.0
+
+    # PIN hashing (bcrypt) runs on its own small thread pool so a burst of
+    # logins can't starve the threadpool every other route runs on
+    pin_hash_workers: int = 2
+    pin_hash_queue_size: int = 8  # Hashes waiting for a worker; more are rejected with 503
+    pin_attempts_per_minute: int = 10  # Per client on login and change-pin, 0 disables throttling
+    pin_attempt_burst: int = 5
 
     class Config:
         env_file = ".env"
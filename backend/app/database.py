@@ -1,14 +1,95 @@
-from sqlalchemy import create_engine
+from sqlalchemy import Table, create_engine, event, inspect, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.schema import CreateTable
 
 from app.config import settings
+from app.utils.money import Cents
 
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False}  # Needed for SQLite
-)
+# Rows per backfill transaction when moving amounts to integer cents
+MONEY_BACKFILL_BATCH_ROWS = 10_000
+
+
+def sqlite_pragmas(read_only: bool = False) -> list[str]:
+    """PRAGMA statements of the configured SQLite connection profile."""
+    pragmas = [
+        # Only takes effect on a new database file; existing ones are converted
+        # with python -m app.services.maintenance --enable-auto-vacuum
+        "PRAGMA auto_vacuum=INCREMENTAL",
+        f"PRAGMA journal_mode={settings.sqlite_journal_mode}",
+        f"PRAGMA synchronous={settings.sqlite_synchronous}",
+        f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}",
+        f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}",
+        f"PRAGMA cache_size={-int(settings.sqlite_cache_size_kb)}",  # Negative is KiB, not pages
+    ]
+    if read_only:
+        pragmas = pragmas[1:] + ["PRAGMA query_only=ON"]
+    return pragmas
+
+
+def _pool_options(url) -> dict:
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+    }
+
+
+def _apply_sqlite_profile(new_engine: Engine, read_only: bool) -> None:
+    """Run the profile's PRAGMAs on every new connection of a file database."""
+    url = new_engine.url
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        return
+    pragmas = sqlite_pragmas(read_only)
+
+    @event.listens_for(new_engine, "connect")
+    def apply_profile(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def create_app_engine(read_only: bool = False) -> Engine:
+    """Engine for database_url, with the SQLite profile applied on connect."""
+    url = make_url(settings.database_url)
+    if url.get_backend_name() != "sqlite":
+        return create_engine(url)
+
+    new_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},  # Needed for SQLite
+        **_pool_options(url),
+    )
+    _apply_sqlite_profile(new_engine, read_only)
+    return new_engine
+
+
+def create_async_app_engine(read_only: bool = False) -> AsyncEngine:
+    """Async engine for database_url (SQLite through aiosqlite), same profile."""
+    url = make_url(settings.database_url)
+    if url.get_backend_name() == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+
+    new_engine = create_async_engine(url, **_pool_options(url))
+    _apply_sqlite_profile(new_engine.sync_engine, read_only)
+    return new_engine
+
+
+engine = create_app_engine()
+read_engine = create_app_engine(read_only=True) if settings.database_read_engine else engine
+
+# Async routes hold no threadpool thread while they wait on the database
+async_engine = create_async_app_engine()
+async_read_engine = create_async_app_engine(read_only=True) if settings.database_read_engine else async_engine
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
@@ -19,3 +100,148 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """Session for routes that only read; on the read-only engine when enabled."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db():
+    """AsyncSession for routes that only read; on the read-only engine when enabled."""
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
+async def dispose_async_engines() -> None:
+    """Close the async engines' pooled connections (called on app shutdown)."""
+    await async_engine.dispose()
+    if async_read_engine is not async_engine:
+        await async_read_engine.dispose()
+
+
+def migrate_schema():
+    """Bring an existing database up to date with the models.
+
+    create_all only creates missing tables, so columns and indexes added to
+    existing tables are applied here. New columns must be nullable or have
+    a server default. Amounts still in legacy REAL columns are then moved
+    to integer cents.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+    for table in Base.metadata.sorted_tables:
+        _convert_money_columns(table)
+
+
+def _convert_money_columns(table: Table, batch_rows: int = MONEY_BACKFILL_BATCH_ROWS):
+    """Move amounts from legacy REAL columns into their integer-cents twins.
+
+    A database from before amounts were stored as cents has both `amount`
+    and (added by migrate_schema) `amount_cents`. The copy runs online:
+    triggers keep the cents columns current for rows other connections
+    write meanwhile, and rows are converted in rowid batches of one short
+    write transaction each, so readers and writers interleave. Only the
+    final step rewrites the table: it is rebuilt from the model's DDL, which
+    drops the legacy columns and makes the cents columns NOT NULL as on a
+    fresh database.
+    """
+    inspector = inspect(engine)
+    if not inspector.has_table(table.name):
+        return
+    existing = {c["name"]: c for c in inspector.get_columns(table.name)}
+    cents_columns = [c for c in table.columns if isinstance(c.type, Cents)]
+    pairs = [
+        (c.name.removesuffix("_cents"), c.name) for c in cents_columns if c.name.removesuffix("_cents") in existing
+    ]
+    if not pairs:
+        # Converted before the rebuild step existed: the cents columns were
+        # added by ALTER TABLE and are still nullable
+        if any(not c.nullable and existing.get(c.name, {}).get("nullable") for c in cents_columns):
+            with engine.begin() as conn:
+                conn.execute(text(f"UPDATE {table.name} SET rowid = rowid WHERE 0"))  # Takes the write lock
+                if _nullable_cents_columns(conn, table):
+                    _rebuild_table(conn, table)
+        return
+
+    name = table.name
+    legacy = ", ".join(old for old, _ in pairs)
+    assignments = ", ".join(f"{new} = CAST(ROUND({{row}}{old} * 100) AS INTEGER)" for old, new in pairs)
+    sync_row = f"BEGIN UPDATE {name} SET {assignments.format(row='NEW.')} WHERE rowid = NEW.rowid; END"
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {name}_cents_insert AFTER INSERT ON {name} {sync_row}"))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {name}_cents_update AFTER UPDATE OF {legacy} ON {name} {sync_row}"
+        ))
+        last_rowid = conn.execute(text(f"SELECT MAX(rowid) FROM {name}")).scalar() or 0
+
+    backfill = text(f"UPDATE {name} SET {assignments.format(row='')} WHERE rowid > :low AND rowid <= :high")
+    for low in range(0, last_rowid, batch_rows):
+        with engine.begin() as conn:
+            conn.execute(backfill, {"low": low, "high": low + batch_rows})
+
+    # The catch-up write opens the transaction and takes the write lock, so
+    # no row can land between dropping the triggers and rebuilding the table
+    unconverted = " OR ".join(f"({new} IS NULL AND {old} IS NOT NULL)" for old, new in pairs)
+    with engine.begin() as conn:
+        conn.execute(text(f"UPDATE {name} SET {assignments.format(row='')} WHERE {unconverted}"))
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {name}_cents_insert"))
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {name}_cents_update"))
+        # Another worker migrating at the same time may have rebuilt it already
+        remaining = {row[1] for row in conn.execute(text(f"PRAGMA table_info({name})"))}
+        if any(old in remaining for old, _ in pairs):
+            _rebuild_table(conn, table)
+
+
+def _nullable_cents_columns(conn, table: Table) -> bool:
+    """Whether a cents column the model declares NOT NULL is nullable in the database."""
+    nullable = {row[1] for row in conn.execute(text(f"PRAGMA table_info({table.name})")) if not row[3]}
+    return any(isinstance(c.type, Cents) and not c.nullable and c.name in nullable for c in table.columns)
+
+
+def _rebuild_table(conn, table: Table) -> None:
+    """Recreate a table from the model's DDL, keeping its rows.
+
+    SQLite's ALTER TABLE can't add NOT NULL to a column, so this is its
+    documented rebuild: create the new table, copy the rows, drop the old
+    table, rename the new one and recreate the indexes. Columns not in the
+    model are dropped. Runs in the caller's write transaction. A row with
+    NULL in a NOT NULL column fails the copy and rolls the rebuild back.
+    """
+    if conn.execute(text("PRAGMA foreign_keys")).scalar():
+        # DROP TABLE would delete or reject the rows that reference this one
+        raise RuntimeError(f"Rebuilding {table.name} needs foreign key enforcement off")
+
+    rebuilt = f"{table.name}_rebuild"
+    ddl = str(CreateTable(table).compile(dialect=conn.dialect))
+    conn.execute(text(ddl.replace(f"CREATE TABLE {table.name} ", f"CREATE TABLE {rebuilt} ", 1)))
+    existing = {row[1] for row in conn.execute(text(f"PRAGMA table_info({table.name})"))}
+    columns = ", ".join(c.name for c in table.columns if c.name in existing)
+    conn.execute(text(f"INSERT INTO {rebuilt} ({columns}) SELECT {columns} FROM {table.name}"))
+    conn.execute(text(f"DROP TABLE {table.name}"))
+    conn.execute(text(f"ALTER TABLE {rebuilt} RENAME TO {table.name}"))
+    for index in table.indexes:
+        index.create(conn)
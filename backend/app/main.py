@@ -1,13 +1,22 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
-from app.database import engine, Base, SessionLocal
+from app.database import engine, Base, SessionLocal, dispose_async_engines, migrate_schema
 from app.routers import auth, transactions, categories, budgets, recurring, goals, reports, import_export, banking
+from app.services.bank_provider import close_bank_provider
+from app.services.csv_validation import shutdown_pool
+from app.services.exchange_rate_service import close_http_client, load_snapshot, rate_refresh_loop
+from app.services.maintenance import maintenance_loop
 from app.services.seed import seed_default_categories
+from app.utils.security import shutdown_pin_executor
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+migrate_schema()
 
 # Seed default categories
 db = SessionLocal()
@@ -16,7 +25,30 @@ try:
 finally:
     db.close()
 
-app = FastAPI(title=settings.app_name)
+# Serve the last good exchange rates until the first refresh
+load_snapshot()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    tasks = []
+    if settings.maintenance_interval_minutes > 0:
+        tasks.append(asyncio.create_task(maintenance_loop()))
+    if settings.exchange_rate_background_refresh and settings.exchange_rate_provider != "static":
+        tasks.append(asyncio.create_task(rate_refresh_loop()))
+
+    yield
+
+    for task in tasks:
+        task.cancel()
+    await close_bank_provider()
+    await close_http_client()
+    shutdown_pool()
+    shutdown_pin_executor()
+    await dispose_async_engines()
+
+
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
 
 # Configure CORS for frontend
 app.add_middleware(
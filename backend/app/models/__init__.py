@@ -4,7 +4,11 @@ from app.models.transaction import Transaction
 from app.models.budget import Budget
 from app.models.recurring import RecurringTransaction
 from app.models.goal import Goal
-from app.models.bank import BankConnection, PendingTransaction
+from app.models.bank import BankConnection, PendingTransaction, ProcessedExternalId, BalanceSnapshot, MerchantCategoryStat
+from app.models.import_batch import ImportBatch, ImportRow
+from app.models.exchange_rate import ExchangeRate, RateSnapshot
+from app.models.lease import Lease
+from app.models.cache_version import CacheVersion
 from app.models.currency import (
     Currency,
     SUPPORTED_CURRENCIES,
@@ -22,6 +26,15 @@ __all__ = [
     "Goal",
     "BankConnection",
     "PendingTransaction",
+    "ProcessedExternalId",
+    "BalanceSnapshot",
+    "MerchantCategoryStat",
+    "ImportBatch",
+    "ImportRow",
+    "ExchangeRate",
+    "RateSnapshot",
+    "Lease",
+    "CacheVersion",
     "Currency",
     "SUPPORTED_CURRENCIES",
     "CURRENCY_SYMBOLS",
@@ -1,9 +1,10 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 
 from app.database import Base
+from app.utils.money import Cents
 
 
 class BankConnection(Base):
@@ -13,12 +14,14 @@ class BankConnection(Base):
     bank_name = Column(String, nullable=False)
     account_name = Column(String, nullable=False)
     account_type = Column(String, nullable=False)  # "checking", "savings", "credit"
-    balance = Column(Float, default=0.0)
+    balance = Column("balance_cents", Cents, key="balance", default=0)
     last_synced = Column(DateTime, nullable=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
     pending_transactions = relationship("PendingTransaction", back_populates="bank_connection", cascade="all, delete-orphan")
+    processed_external_ids = relationship("ProcessedExternalId", cascade="all, delete-orphan")
+    balance_snapshots = relationship("BalanceSnapshot", cascade="all, delete-orphan")
 
 
 class PendingTransaction(Base):
@@ -27,12 +30,64 @@ class PendingTransaction(Base):
     id = Column(Integer, primary_key=True, index=True)
     bank_connection_id = Column(Integer, ForeignKey("bank_connections.id"), nullable=False)
     external_id = Column(String, nullable=False)  # ID from the bank
-    amount = Column(Float, nullable=False)
+    amount = Column("amount_cents", Cents, key="amount", nullable=False)
     merchant_name = Column(String, nullable=False)
     date = Column(String, nullable=False)  # YYYY-MM-DD
     suggested_category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
     status = Column(String, default="pending")  # "pending", "imported", "dismissed"
+    duplicate_of_id = Column(Integer, ForeignKey("transactions.id"), nullable=True)  # Likely duplicate ledger row
+    processed_at = Column(DateTime, nullable=True)  # When imported or dismissed
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
     bank_connection = relationship("BankConnection", back_populates="pending_transactions")
     suggested_category = relationship("Category")
+
+    __table_args__ = (
+        # Partial index: the review screen only ever reads status = 'pending'
+        Index(
+            "ix_pending_transactions_review",
+            "date",
+            sqlite_where=(status == "pending"),
+        ),
+        Index("ix_pending_transactions_external", "bank_connection_id", "external_id"),
+    )
+
+
+class ProcessedExternalId(Base):
+    """Dedup key left behind when a processed pending transaction is compacted."""
+    __tablename__ = "processed_external_ids"
+
+    bank_connection_id = Column(Integer, ForeignKey("bank_connections.id"), primary_key=True)
+    external_id = Column(String, primary_key=True)
+    status = Column(String, nullable=False)  # "imported" or "dismissed"
+
+    __table_args__ = {"sqlite_with_rowid": False}
+
+
+class BalanceSnapshot(Base):
+    """Account balance at a point in time.
+
+    Maintenance downsamples old raw snapshots to one per day, then one per month.
+    """
+    __tablename__ = "balance_snapshots"
+
+    id = Column(Integer, primary_key=True)
+    bank_connection_id = Column(Integer, ForeignKey("bank_connections.id"), nullable=False)
+    balance = Column("balance_cents", Cents, key="balance", nullable=False)
+    recorded_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    resolution = Column(String, nullable=False, default="raw")  # "raw", "daily", "monthly"
+
+    __table_args__ = (
+        Index("ix_balance_snapshots_tier", "resolution", "recorded_at"),
+        Index("ix_balance_snapshots_connection", "bank_connection_id", "recorded_at"),
+    )
+
+
+class MerchantCategoryStat(Base):
+    """How often a merchant token was imported under a category."""
+    __tablename__ = "merchant_category_stats"
+
+    token = Column(String, primary_key=True)
+    category_id = Column(Integer, ForeignKey("categories.id"), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
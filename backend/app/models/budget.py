@@ -1,9 +1,10 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 
 from app.database import Base
+from app.utils.money import Cents
 
 
 class Budget(Base):
@@ -11,7 +12,7 @@ class Budget(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
-    amount = Column(Float, nullable=False)
+    amount = Column("amount_cents", Cents, key="amount", nullable=False)
     month = Column(String, nullable=False)  # Format: "YYYY-MM"
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, String
+
+from app.database import Base
+
+
+class CacheVersion(Base):
+    """Change counter for cached reference data, shared by every worker process."""
+    __tablename__ = "cache_versions"
+
+    name = Column(String, primary_key=True)  # e.g. "categories"
+    version = Column(Integer, nullable=False, default=0)
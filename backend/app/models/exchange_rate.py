@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Text
+
+from app.database import Base
+
+
+class ExchangeRate(Base):
+    """Daily rate for one currency pair.
+
+    The primary key (base, quote, date) is the index for range and as-of
+    lookups; days without a published rate (weekends) have no row.
+    """
+    __tablename__ = "exchange_rates"
+
+    base = Column(String, primary_key=True)
+    quote = Column(String, primary_key=True)
+    date = Column(Date, primary_key=True)
+    rate = Column(Float, nullable=False)
+
+    __table_args__ = {"sqlite_with_rowid": False}
+
+
+class RateSnapshot(Base):
+    """The last good set of live rates, so restarts don't fall back to static rates.
+
+    A single row (id 1); rates are JSON keyed "FROM_TO" like get_all_rates.
+    """
+    __tablename__ = "exchange_rate_snapshots"
+
+    id = Column(Integer, primary_key=True)
+    provider = Column(String, nullable=False)  # Provider the rates came from
+    pivot_currency = Column(String, nullable=True)  # Set when cross rates were derived
+    fetched_at = Column(DateTime, nullable=False)
+    rates = Column(Text, nullable=False)
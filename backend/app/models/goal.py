@@ -1,8 +1,9 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Date
+from sqlalchemy import Column, Integer, String, DateTime, Date
 
 from app.database import Base
+from app.utils.money import Cents
 
 
 class Goal(Base):
@@ -10,7 +11,7 @@ class Goal(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
-    target_amount = Column(Float, nullable=False)
-    current_amount = Column(Float, default=0.0)
+    target_amount = Column("target_amount_cents", Cents, key="target_amount", nullable=False)
+    current_amount = Column("current_amount_cents", Cents, key="current_amount", default=0)
     deadline = Column(Date, nullable=False)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
@@ -0,0 +1,43 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+
+from app.database import Base
+from app.utils.money import Cents
+
+
+class ImportBatch(Base):
+    """An uploaded CSV file staged for review before it is confirmed."""
+    __tablename__ = "import_batches"
+
+    id = Column(Integer, primary_key=True, index=True)
+    filename = Column(String, nullable=False)
+    digest = Column(String, nullable=True, index=True)  # SHA-256 of the uploaded file
+    status = Column(String, default="staged")  # "staged", "confirmed"
+    total_rows = Column(Integer, default=0)
+    valid_rows = Column(Integer, default=0)
+    error_count = Column(Integer, default=0)
+    duplicates = Column(Integer, default=0)
+    already_imported = Column(Integer, default=0)  # Rows whose fingerprint is already in the ledger
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class ImportRow(Base):
+    """A validated CSV row waiting in staging."""
+    __tablename__ = "import_rows"
+
+    id = Column(Integer, primary_key=True)
+    import_id = Column(Integer, ForeignKey("import_batches.id"), nullable=False)
+    line = Column(Integer, nullable=False)  # Line number in the uploaded file
+    date = Column(String, nullable=False)  # YYYY-MM-DD
+    amount = Column("amount_cents", Cents, key="amount", nullable=False)
+    type = Column(String, nullable=False)
+    category = Column(String, nullable=False)
+    description = Column(String, nullable=True)
+    duplicate_of = Column(Integer, nullable=True)  # Ledger row this likely duplicates
+    row_hash = Column(Integer, nullable=True)  # Content hash, see duplicate_service.row_hash
+    fingerprint = Column(String, nullable=True)  # row_hash plus occurrence within the file
+
+    __table_args__ = (
+        Index("ix_import_rows_import_line", "import_id", "line"),
+    )
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, DateTime
+
+from app.database import Base
+
+
+class Lease(Base):
+    """A named, expiring claim that lets one worker process do a shared job."""
+    __tablename__ = "leases"
+
+    name = Column(String, primary_key=True)
+    owner = Column(String, nullable=False)  # "hostname:pid" of the holder
+    expires_at = Column(DateTime, nullable=False)
@@ -1,16 +1,17 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Date
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Date
 from sqlalchemy.orm import relationship
 
 from app.database import Base
+from app.utils.money import Cents
 
 
 class RecurringTransaction(Base):
     __tablename__ = "recurring_transactions"
 
     id = Column(Integer, primary_key=True, index=True)
-    amount = Column(Float, nullable=False)
+    amount = Column("amount_cents", Cents, key="amount", nullable=False)
     type = Column(String, nullable=False)  # "income" or "expense"
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
     description = Column(String, nullable=True)
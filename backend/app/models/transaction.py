@@ -1,20 +1,23 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Date
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Date
 from sqlalchemy.orm import relationship
 
 from app.database import Base
+from app.utils.money import Cents
 
 
 class Transaction(Base):
     __tablename__ = "transactions"
 
     id = Column(Integer, primary_key=True, index=True)
-    amount = Column(Float, nullable=False)
+    amount = Column("amount_cents", Cents, key="amount", nullable=False)
     type = Column(String, nullable=False)  # "income" or "expense"
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
     description = Column(String, nullable=True)
-    date = Column(Date, nullable=False)
+    date = Column(Date, nullable=False, index=True)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    # Content fingerprint of imported rows; re-imports conflict on it and are skipped
+    fingerprint = Column(String, nullable=True, unique=True, index=True)
 
     category = relationship("Category")
@@ -1,8 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import math
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.models import UserSettings
+from app.config import settings
+from app.database import SessionLocal, get_db, get_read_db
+from app.models import UserSettings, SUPPORTED_CURRENCIES
 from app.schemas.user import (
     PinSetup,
     PinLogin,
@@ -12,52 +18,109 @@ from app.schemas.user import (
     CurrencyUpdate,
     ExchangeRatesResponse,
 )
-from app.utils.security import hash_pin, verify_pin, create_access_token
+from app.utils.security import PinHashingBusy, hash_pin_async, verify_pin_async, create_access_token
+from app.utils.throttle import AttemptThrottle
 from app.services.exchange_rate_service import (
     refresh_rates,
+    schedule_refresh,
+    sync_snapshot_async,
     get_all_rates,
     get_cache_info,
     invalidate_cache,
 )
+from app.services.rate_history import backfill_rates, rate_series
+from app.services.reference_data import USER_SETTINGS, reference_data
 
 router = APIRouter()
 
+# Login and PIN-change attempts per client, checked before any bcrypt work
+pin_throttle = AttemptThrottle(settings.pin_attempts_per_minute, settings.pin_attempt_burst)
+
+
+def check_pin_attempt(request: Request) -> None:
+    client = request.client.host if request.client else "unknown"
+    retry_after = pin_throttle.attempt(client)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many PIN attempts, try again later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
+async def run_pin_hashing(operation):
+    """Await a PIN hash/verify, answering 503 when the hashing queue is full."""
+    try:
+        return await operation
+    except PinHashingBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many PIN requests in progress, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+
+
+# The PIN routes are async so they can await the hashing pool. Their database
+# work runs in worker threads, each with a short session of its own, so no
+# blocking I/O happens on the event loop and no pooled connection is held
+# while bcrypt runs.
+
+def _load_user_settings():
+    with SessionLocal() as db:
+        return reference_data.user_settings(db)
+
+
+def _save_pin_hash(pin_hash: str, user_id: int | None = None) -> bool:
+    """Store the PIN hash: a new settings row when user_id is None.
+
+    Returns False, storing nothing, if a new row is asked for but another
+    request has set up a PIN meanwhile.
+    """
+    with SessionLocal() as db:
+        if user_id is None:
+            if db.query(UserSettings.id).first():
+                return False
+            db.add(UserSettings(pin_hash=pin_hash))
+        else:
+            db.execute(update(UserSettings).where(UserSettings.id == user_id).values(pin_hash=pin_hash))
+        reference_data.mark_changed(db, USER_SETTINGS)
+        db.commit()
+    return True
+
 
 @router.get("/status", response_model=UserSettingsResponse)
-def get_status(db: Session = Depends(get_db)):
-    user = db.query(UserSettings).first()
+def get_status(db: Session = Depends(get_read_db)):
+    user = reference_data.user_settings(db)
     if user:
         return UserSettingsResponse(currency=user.currency, is_setup=True)
     return UserSettingsResponse(currency="USD", is_setup=False)
 
 
 @router.post("/setup", response_model=Token)
-def setup_pin(data: PinSetup, db: Session = Depends(get_db)):
-    existing = db.query(UserSettings).first()
-    if existing:
+async def setup_pin(data: PinSetup):
+    user = await asyncio.to_thread(_load_user_settings)
+    pin_hash = None if user else await run_pin_hashing(hash_pin_async(data.pin))
+    if not pin_hash or not await asyncio.to_thread(_save_pin_hash, pin_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="PIN already set up"
         )
 
-    user = UserSettings(pin_hash=hash_pin(data.pin))
-    db.add(user)
-    db.commit()
-
     token = create_access_token({"sub": "user"})
     return Token(access_token=token)
 
 
 @router.post("/login", response_model=Token)
-def login(data: PinLogin, db: Session = Depends(get_db)):
-    user = db.query(UserSettings).first()
+async def login(data: PinLogin, request: Request):
+    check_pin_attempt(request)
+    user = await asyncio.to_thread(_load_user_settings)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="PIN not set up"
         )
 
-    if not verify_pin(data.pin, user.pin_hash):
+    if not await run_pin_hashing(verify_pin_async(data.pin, user.pin_hash)):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid PIN"
@@ -68,22 +131,23 @@ def login(data: PinLogin, db: Session = Depends(get_db)):
 
 
 @router.post("/change-pin")
-def change_pin(data: PinChange, db: Session = Depends(get_db)):
-    user = db.query(UserSettings).first()
+async def change_pin(data: PinChange, request: Request):
+    check_pin_attempt(request)
+    user = await asyncio.to_thread(_load_user_settings)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="PIN not set up"
         )
 
-    if not verify_pin(data.current_pin, user.pin_hash):
+    if not await run_pin_hashing(verify_pin_async(data.current_pin, user.pin_hash)):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid current PIN"
         )
 
-    user.pin_hash = hash_pin(data.new_pin)
-    db.commit()
+    pin_hash = await run_pin_hashing(hash_pin_async(data.new_pin))
+    await asyncio.to_thread(_save_pin_hash, pin_hash, user.id)
 
     return {"message": "PIN changed successfully"}
 
@@ -91,14 +155,15 @@ def change_pin(data: PinChange, db: Session = Depends(get_db)):
 @router.put("/currency")
 def update_currency(data: CurrencyUpdate, db: Session = Depends(get_db)):
     """Update user's preferred currency."""
-    user = db.query(UserSettings).first()
+    user = reference_data.user_settings(db)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User not set up"
         )
 
-    user.currency = data.currency
+    db.execute(update(UserSettings).where(UserSettings.id == user.id).values(currency=data.currency))
+    reference_data.mark_changed(db, USER_SETTINGS)
     db.commit()
 
     return {"message": "Currency updated", "currency": data.currency}
@@ -106,8 +171,9 @@ def update_currency(data: CurrencyUpdate, db: Session = Depends(get_db)):
 
 @router.get("/exchange-rates", response_model=ExchangeRatesResponse)
 async def get_exchange_rates():
-    """Get current exchange rates."""
-    await refresh_rates()
+    """Get current exchange rates from the cache, refreshing stale ones in the background."""
+    await sync_snapshot_async()
+    schedule_refresh()
     cache_info = get_cache_info()
 
     return ExchangeRatesResponse(
@@ -121,7 +187,7 @@ async def get_exchange_rates():
 async def refresh_exchange_rates():
     """Force refresh exchange rates from provider."""
     invalidate_cache()
-    success = await refresh_rates()
+    success = await refresh_rates(force=True)
 
     cache_info = get_cache_info()
     return {
@@ -129,3 +195,40 @@ async def refresh_exchange_rates():
         "provider": cache_info["provider"],
         "cached_at": cache_info["cached_at"],
     }
+
+
+@router.post("/exchange-rates/history/backfill")
+async def backfill_exchange_rate_history(start_date: date, end_date: date | None = None):
+    """Load daily historical rates for every supported pair from the provider."""
+    end_date = end_date or date.today()
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must be on or before end_date"
+        )
+    try:
+        stored = await backfill_rates(start_date, end_date)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Failed to fetch historical rates: {e}"
+        )
+    return {"stored": stored, "start_date": start_date, "end_date": end_date}
+
+
+@router.get("/exchange-rates/history")
+def get_exchange_rate_history(
+    base: str = Query(..., description="Currency code, e.g. USD"),
+    quote: str = Query(..., description="Currency code, e.g. EUR"),
+    start_date: date = Query(...),
+    end_date: date | None = None,
+    db: Session = Depends(get_read_db)
+):
+    """Daily rates for one pair, starting with the rate in effect on start_date."""
+    if base not in SUPPORTED_CURRENCIES or quote not in SUPPORTED_CURRENCIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported currency. Supported: {SUPPORTED_CURRENCIES}"
+        )
+    series = rate_series(db, base, quote, start_date, end_date or date.today())
+    return [{"date": day, "rate": rate} for day, rate in series]
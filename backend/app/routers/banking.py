@@ -1,26 +1,46 @@
-from datetime import datetime, timezone
-
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-
-from app.database import get_db
-from app.models import BankConnection, PendingTransaction, Transaction, Category
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
+from anyio import from_thread
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import func, insert, select, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+
+from app.database import get_async_read_db, get_db
+from app.models import (
+    BankConnection,
+    PendingTransaction,
+    ProcessedExternalId,
+    BalanceSnapshot,
+    Transaction,
+    Category,
+)
 from app.schemas.bank import (
     BankConnectionCreate,
     BankConnectionResponse,
     PendingTransactionResponse,
     PendingTransactionImport,
+    PendingBulkAction,
     BankBalanceResponse,
+    BalanceHistoryPoint,
+    BalanceHistoryResponse,
 )
+from app.services.bank_provider import BankProviderError, get_bank_provider
+from app.services.duplicate_service import DuplicateDetector
 from app.services.mock_bank_service import (
     get_available_banks,
     generate_mock_balance,
-    generate_mock_transactions,
-    suggest_category,
+    suggest_categories,
 )
+from app.services.merchant_category_service import merchant_model
+from app.services.reference_data import reference_data
 
 router = APIRouter()
 
+# Balance snapshot tiers, finest first (see services.maintenance)
+SNAPSHOT_TIERS = ["raw", "daily", "monthly"]
+
 
 @router.get("/banks")
 def list_available_banks():
@@ -29,9 +49,9 @@ def list_available_banks():
 
 
 @router.get("/connections", response_model=list[BankConnectionResponse])
-def list_connections(db: Session = Depends(get_db)):
+async def list_connections(db: AsyncSession = Depends(get_async_read_db)):
     """List all connected bank accounts."""
-    return db.query(BankConnection).filter(BankConnection.is_active == True).all()
+    return (await db.scalars(select(BankConnection).where(BankConnection.is_active == True))).all()
 
 
 @router.post("/connections", response_model=BankConnectionResponse, status_code=status.HTTP_201_CREATED)
@@ -43,6 +63,7 @@ def create_connection(data: BankConnectionCreate, db: Session = Depends(get_db))
         account_type=data.account_type,
         balance=generate_mock_balance(data.account_type),
     )
+    connection.balance_snapshots.append(BalanceSnapshot(balance=connection.balance))
     db.add(connection)
     db.commit()
     db.refresh(connection)
@@ -67,53 +88,76 @@ def sync_connection(connection_id: int, db: Session = Depends(get_db)):
     if not connection:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Connection not found")
 
-    # Generate mock transactions
-    mock_transactions = generate_mock_transactions(count=random_transaction_count())
+    # Fetch from the bank provider on the event loop, sharing its connection pool
+    provider = get_bank_provider()
+    try:
+        bank_transactions, balance = from_thread.run(provider.fetch_account, connection)
+    except BankProviderError as e:
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(e))
+
+    # Check for existing external IDs to avoid duplicates, including
+    # processed rows that maintenance has compacted to dedup keys
+    batch_ids = [tx["external_id"] for tx in bank_transactions]
+    existing_ids = {
+        row.external_id for row in db.query(PendingTransaction.external_id).filter(
+            PendingTransaction.bank_connection_id == connection_id,
+            PendingTransaction.external_id.in_(batch_ids),
+        )
+    }
+    existing_ids.update(
+        row.external_id for row in db.query(ProcessedExternalId.external_id).filter(
+            ProcessedExternalId.bank_connection_id == connection_id,
+            ProcessedExternalId.external_id.in_(batch_ids),
+        )
+    )
 
-    # Check for existing external IDs to avoid duplicates
-    existing_ids = set(
-        t.external_id for t in db.query(PendingTransaction).filter(
-            PendingTransaction.bank_connection_id == connection_id
-        ).all()
+    # Flag rows that are probably already in the ledger
+    detector = DuplicateDetector.from_ledger(
+        db, [datetime.strptime(tx["date"], "%Y-%m-%d").date() for tx in bank_transactions]
     )
 
-    created = 0
-    for tx in mock_transactions:
-        if tx["external_id"] in existing_ids:
-            continue
+    new_transactions = [tx for tx in bank_transactions if tx["external_id"] not in existing_ids]
+    suggestions = suggest_categories([tx["merchant_name"] for tx in new_transactions], db)
 
+    created = 0
+    duplicates = 0
+    for tx, suggested_category_id in zip(new_transactions, suggestions):
+        duplicate_of_id = detector.find(
+            tx["amount"], datetime.strptime(tx["date"], "%Y-%m-%d").date(), tx["merchant_name"]
+        )
         pending = PendingTransaction(
             bank_connection_id=connection_id,
             external_id=tx["external_id"],
             amount=tx["amount"],
             merchant_name=tx["merchant_name"],
             date=tx["date"],
-            suggested_category_id=suggest_category(tx["merchant_name"], db),
+            suggested_category_id=suggested_category_id,
             status="pending",
+            duplicate_of_id=duplicate_of_id,
         )
         db.add(pending)
         created += 1
+        if duplicate_of_id:
+            duplicates += 1
 
     # Update connection
     connection.last_synced = datetime.now(timezone.utc)
-    connection.balance = generate_mock_balance(connection.account_type)
+    connection.balance = balance
+    db.add(BalanceSnapshot(bank_connection_id=connection_id, balance=balance))
 
     db.commit()
-    return {"synced": created, "balance": connection.balance}
-
-
-def random_transaction_count() -> int:
-    """Return a random number of transactions to generate."""
-    import random
-    return random.randint(5, 15)
+    return {"synced": created, "duplicates": duplicates, "balance": connection.balance}
 
 
 @router.get("/pending", response_model=list[PendingTransactionResponse])
-def list_pending(db: Session = Depends(get_db)):
+async def list_pending(db: AsyncSession = Depends(get_async_read_db)):
     """List all pending transactions for review."""
-    return db.query(PendingTransaction).filter(
-        PendingTransaction.status == "pending"
-    ).order_by(PendingTransaction.date.desc()).all()
+    return (await db.scalars(
+        select(PendingTransaction)
+        .where(PendingTransaction.status == "pending")
+        .options(selectinload(PendingTransaction.suggested_category))
+        .order_by(PendingTransaction.date.desc())
+    )).all()
 
 
 @router.post("/pending/{pending_id}/import", response_model=dict)
@@ -131,25 +175,37 @@ def import_transaction(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Transaction already processed")
 
     # Get category to determine type
-    category = db.query(Category).filter(Category.id == data.category_id).first()
+    category = reference_data.categories(db).by_id.get(data.category_id)
     if not category:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid category")
 
+    tx_date = datetime.strptime(pending.date, "%Y-%m-%d").date()
+
+    # Flag likely duplicates of ledger rows; the import still goes ahead
+    detector = DuplicateDetector.from_ledger(db, [tx_date])
+    pending.duplicate_of_id = detector.find(pending.amount, tx_date, pending.merchant_name)
+
     # Create actual transaction
     transaction = Transaction(
         amount=pending.amount,
         type=category.type,
         category_id=data.category_id,
         description=pending.merchant_name,
-        date=datetime.strptime(pending.date, "%Y-%m-%d").date(),
+        date=tx_date,
     )
     db.add(transaction)
 
-    # Mark pending as imported
+    # Mark pending as imported and learn from the chosen category
     pending.status = "imported"
+    pending.processed_at = datetime.now(timezone.utc)
+    merchant_model.learn(pending.merchant_name, data.category_id, db)
 
     db.commit()
-    return {"message": "Transaction imported", "transaction_id": transaction.id}
+    return {
+        "message": "Transaction imported",
+        "transaction_id": transaction.id,
+        "duplicate_of_id": pending.duplicate_of_id,
+    }
 
 
 @router.post("/pending/{pending_id}/dismiss", status_code=status.HTTP_204_NO_CONTENT)
@@ -160,44 +216,111 @@ def dismiss_transaction(pending_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pending transaction not found")
 
     pending.status = "dismissed"
+    pending.processed_at = datetime.now(timezone.utc)
     db.commit()
 
 
+def _pending_filters(data: PendingBulkAction) -> list:
+    """Build the WHERE clauses selecting pending rows for a bulk action."""
+    filters = [PendingTransaction.status == "pending"]
+    if data.ids is not None:
+        filters.append(PendingTransaction.id.in_(data.ids))
+    if data.merchant_name:
+        filters.append(PendingTransaction.merchant_name == data.merchant_name)
+    if data.bank_connection_id:
+        filters.append(PendingTransaction.bank_connection_id == data.bank_connection_id)
+    if data.start_date:
+        filters.append(PendingTransaction.date >= data.start_date)
+    if data.end_date:
+        filters.append(PendingTransaction.date <= data.end_date)
+    return filters
+
+
+def _bulk_import(db: Session, filters: list, category_id: int | None = None) -> int:
+    """Import every pending row matching filters with one INSERT ... SELECT and one UPDATE.
+
+    Rows are imported under category_id when given, otherwise under their
+    suggested category; rows without a valid category are left pending.
+    """
+    if category_id is not None:
+        if category_id not in reference_data.categories(db).by_id:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid category")
+        onclause = Category.id == category_id
+
+        # An explicit category is a user decision worth learning from
+        merchants = db.execute(
+            select(PendingTransaction.merchant_name, func.count())
+            .where(*filters)
+            .group_by(PendingTransaction.merchant_name)
+        ).all()
+        for merchant_name, count in merchants:
+            merchant_model.learn(merchant_name, category_id, db, weight=count)
+    else:
+        onclause = Category.id == PendingTransaction.suggested_category_id
+        filters = filters + [PendingTransaction.suggested_category_id.in_(select(Category.id))]
+
+    source = select(
+        PendingTransaction.amount,
+        Category.type,
+        Category.id,
+        PendingTransaction.merchant_name,
+        PendingTransaction.date,
+    ).join(Category, onclause).where(*filters)
+
+    db.execute(
+        insert(Transaction).from_select(
+            ["amount", "type", "category_id", "description", "date"], source
+        )
+    )
+    result = db.execute(
+        update(PendingTransaction)
+        .where(*filters)
+        .values(status="imported", processed_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
 @router.post("/pending/import-all")
 def import_all_pending(db: Session = Depends(get_db)):
     """Import all pending transactions with their suggested categories."""
-    pending_list = db.query(PendingTransaction).filter(
-        PendingTransaction.status == "pending"
-    ).all()
-
-    imported = 0
-    for pending in pending_list:
-        if not pending.suggested_category_id:
-            continue
-
-        category = db.query(Category).filter(Category.id == pending.suggested_category_id).first()
-        if not category:
-            continue
-
-        transaction = Transaction(
-            amount=pending.amount,
-            type=category.type,
-            category_id=pending.suggested_category_id,
-            description=pending.merchant_name,
-            date=datetime.strptime(pending.date, "%Y-%m-%d").date(),
-        )
-        db.add(transaction)
-        pending.status = "imported"
-        imported += 1
+    imported = _bulk_import(db, [PendingTransaction.status == "pending"])
+    return {"imported": imported}
 
-    db.commit()
+
+@router.post("/pending/bulk-import")
+def bulk_import_pending(data: PendingBulkAction, db: Session = Depends(get_db)):
+    """Import pending transactions matching the given filters."""
+    filters = _pending_filters(data)
+    if len(filters) == 1:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="At least one filter is required")
+
+    imported = _bulk_import(db, filters, data.category_id)
     return {"imported": imported}
 
 
+@router.post("/pending/bulk-dismiss")
+def bulk_dismiss_pending(data: PendingBulkAction, db: Session = Depends(get_db)):
+    """Dismiss pending transactions matching the given filters."""
+    filters = _pending_filters(data)
+    if len(filters) == 1:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="At least one filter is required")
+
+    result = db.execute(
+        update(PendingTransaction)
+        .where(*filters)
+        .values(status="dismissed", processed_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return {"dismissed": result.rowcount}
+
+
 @router.get("/balances", response_model=list[BankBalanceResponse])
-def get_balances(db: Session = Depends(get_db)):
+async def get_balances(db: AsyncSession = Depends(get_async_read_db)):
     """Get balances for all connected accounts."""
-    connections = db.query(BankConnection).filter(BankConnection.is_active == True).all()
+    connections = (await db.scalars(select(BankConnection).where(BankConnection.is_active == True))).all()
     return [
         BankBalanceResponse(
             bank_connection_id=c.id,
@@ -208,3 +331,80 @@ def get_balances(db: Session = Depends(get_db)):
         )
         for c in connections
     ]
+
+
+@router.get("/balances/history", response_model=BalanceHistoryResponse)
+async def get_balance_history(
+    start_date: date | None = Query(None),
+    end_date: date | None = Query(None),
+    connection_id: int | None = Query(None, description="Omit for net worth across all accounts"),
+    resolution: str | None = Query(None, pattern="^(raw|daily|monthly)$", description="Defaults by range length"),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """Balance (or net worth) over time, served from the downsampled snapshot tiers."""
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=365)
+    if resolution is None:
+        span = (end_date - start_date).days
+        resolution = "monthly" if span > 365 else "daily" if span > 31 else "raw"
+
+    range_start = datetime.combine(start_date, time.min)
+    range_end = datetime.combine(end_date + timedelta(days=1), time.min)
+    account_filter = [BalanceSnapshot.bank_connection_id == connection_id] if connection_id else []
+
+    if resolution == "raw":
+        bucket = BalanceSnapshot.recorded_at
+    else:
+        bucket = func.strftime("%Y-%m-%d" if resolution == "daily" else "%Y-%m", BalanceSnapshot.recorded_at)
+
+    # One branch per tier, each an index range scan on (resolution, recorded_at).
+    # Tiers at or coarser than the requested resolution already hold one row per
+    # bucket and are read as-is; only the finer, recent tiers are grouped.
+    branches = []
+    for tier in SNAPSHOT_TIERS:
+        where = [
+            BalanceSnapshot.resolution == tier,
+            BalanceSnapshot.recorded_at >= range_start,
+            BalanceSnapshot.recorded_at < range_end,
+            *account_filter,
+        ]
+        if SNAPSHOT_TIERS.index(tier) < SNAPSHOT_TIERS.index(resolution):
+            # SQLite returns the bare balance column from the row holding MAX(recorded_at)
+            branch = select(
+                BalanceSnapshot.bank_connection_id,
+                BalanceSnapshot.balance,
+                bucket.label("bucket"),
+                func.max(BalanceSnapshot.recorded_at).label("recorded_at"),
+            ).where(*where).group_by(BalanceSnapshot.bank_connection_id, bucket)
+        else:
+            branch = select(
+                BalanceSnapshot.bank_connection_id,
+                BalanceSnapshot.balance,
+                bucket.label("bucket"),
+                BalanceSnapshot.recorded_at.label("recorded_at"),
+            ).where(*where)
+        branches.append(branch)
+    history = union_all(*branches).subquery()
+    rows = (await db.execute(select(history).order_by(history.c.bucket, history.c.recorded_at))).all()
+
+    # Each account's last balance before the range, so accounts whose first
+    # in-range snapshot comes later still count towards the early points
+    opening = select(
+        BalanceSnapshot.bank_connection_id,
+        BalanceSnapshot.balance,
+        func.max(BalanceSnapshot.recorded_at),
+    ).where(BalanceSnapshot.recorded_at < range_start, *account_filter).group_by(BalanceSnapshot.bank_connection_id)
+    latest: dict[int, Decimal] = {row[0]: row[1] for row in (await db.execute(opening)).all()}
+
+    # Sum across accounts, carrying each account's last balance forward
+    points: list[BalanceHistoryPoint] = []
+    for row in rows:
+        latest[row[0]] = row[1]
+        label = row[2].isoformat() if isinstance(row[2], datetime) else row[2]
+        total = sum(latest.values())
+        if points and points[-1].date == label:
+            points[-1].balance = total
+        else:
+            points.append(BalanceHistoryPoint(date=label, balance=total))
+
+    return BalanceHistoryResponse(resolution=resolution, points=points)
@@ -1,17 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func, select
 
-from app.database import get_db
-from app.models import Budget, Transaction, Category
-from app.schemas.budget import BudgetCreate, BudgetUpdate, BudgetResponse, BudgetStatus
+from app.database import get_async_read_db, get_db
+from app.models import Budget, Transaction
+from app.schemas.budget import BudgetCreate, BudgetResponse, BudgetStatus
 
 router = APIRouter()
 
 
 @router.get("", response_model=list[BudgetResponse])
-def list_budgets(month: str = Query(..., description="Format: YYYY-MM"), db: Session = Depends(get_db)):
-    return db.query(Budget).filter(Budget.month == month).all()
+async def list_budgets(month: str = Query(..., description="Format: YYYY-MM"), db: AsyncSession = Depends(get_async_read_db)):
+    return (await db.scalars(
+        select(Budget).where(Budget.month == month).options(selectinload(Budget.category))
+    )).all()
 
 
 @router.post("", response_model=BudgetResponse, status_code=status.HTTP_201_CREATED)
@@ -35,8 +38,10 @@ def create_or_update_budget(data: BudgetCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/status", response_model=list[BudgetStatus])
-def get_budget_status(month: str = Query(..., description="Format: YYYY-MM"), db: Session = Depends(get_db)):
-    budgets = db.query(Budget).filter(Budget.month == month).all()
+async def get_budget_status(month: str = Query(..., description="Format: YYYY-MM"), db: AsyncSession = Depends(get_async_read_db)):
+    budgets = (await db.scalars(
+        select(Budget).where(Budget.month == month).options(selectinload(Budget.category))
+    )).all()
 
     result = []
     for budget in budgets:
@@ -50,12 +55,12 @@ def get_budget_status(month: str = Query(..., description="Format: YYYY-MM"), db
         else:
             end_date = f"{year}-{int(month_num)+1:02d}-01"
 
-        spent = db.query(func.sum(Transaction.amount)).filter(
+        spent = await db.scalar(select(func.sum(Transaction.amount)).where(
             Transaction.category_id == budget.category_id,
             Transaction.type == "expense",
             Transaction.date >= start_date,
             Transaction.date < end_date
-        ).scalar() or 0.0
+        )) or 0
 
         remaining = budget.amount - spent
         percentage = (spent / budget.amount * 100) if budget.amount > 0 else 0
@@ -1,22 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models import Category
 from app.schemas.category import CategoryCreate, CategoryUpdate, CategoryResponse
+from app.services.reference_data import CATEGORIES, reference_data
 
 router = APIRouter()
 
 
 @router.get("", response_model=list[CategoryResponse])
-def list_categories(db: Session = Depends(get_db)):
-    return db.query(Category).all()
+def list_categories(db: Session = Depends(get_read_db)):
+    return reference_data.categories(db).all
 
 
 @router.post("", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED)
 def create_category(data: CategoryCreate, db: Session = Depends(get_db)):
     category = Category(**data.model_dump(), is_default=False)
     db.add(category)
+    reference_data.mark_changed(db, CATEGORIES)
     db.commit()
     db.refresh(category)
     return category
@@ -32,6 +34,7 @@ def update_category(category_id: int, data: CategoryUpdate, db: Session = Depend
     for key, value in update_data.items():
         setattr(category, key, value)
 
+    reference_data.mark_changed(db, CATEGORIES)
     db.commit()
     db.refresh(category)
     return category
@@ -50,4 +53,5 @@ def delete_category(category_id: int, db: Session = Depends(get_db)):
         )
 
     db.delete(category)
+    reference_data.mark_changed(db, CATEGORIES)
     db.commit()
@@ -3,7 +3,7 @@ from datetime import date
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models import Goal
 from app.schemas.goal import GoalCreate, GoalUpdate, GoalContribute, GoalResponse
 
@@ -26,7 +26,7 @@ def goal_to_response(goal: Goal) -> dict:
 
 
 @router.get("", response_model=list[GoalResponse])
-def list_goals(db: Session = Depends(get_db)):
+def list_goals(db: Session = Depends(get_read_db)):
     goals = db.query(Goal).all()
     return [goal_to_response(g) for g in goals]
 
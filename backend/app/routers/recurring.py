@@ -3,7 +3,7 @@ from datetime import date, timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models import RecurringTransaction, Transaction
 from app.schemas.recurring import RecurringCreate, RecurringUpdate, RecurringResponse
 
@@ -11,7 +11,7 @@ router = APIRouter()
 
 
 @router.get("", response_model=list[RecurringResponse])
-def list_recurring(db: Session = Depends(get_db)):
+def list_recurring(db: Session = Depends(get_read_db)):
     return db.query(RecurringTransaction).all()
 
 
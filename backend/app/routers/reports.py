@@ -1,18 +1,53 @@
+import asyncio
 from datetime import date
 from dateutil.relativedelta import relativedelta
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app.models import Transaction, Category
+from app.config import settings
+from app.database import get_async_read_db
+from app.models import Transaction, Category, SUPPORTED_CURRENCIES
+from app.services.exchange_rate_service import get_exchange_rate
+from app.services.rate_history import rate_as_of
+from app.services.reference_data import reference_data
+from app.utils.money import Cents
 
 router = APIRouter()
 
+CURRENCY_QUERY = Query(None, description="Convert amounts to this currency at each transaction's date")
+
+
+async def _amount_in(currency: str | None, db: AsyncSession):
+    """Transaction.amount, converted from the ledger currency when currency is given.
+
+    Each row uses the historical rate on its date, joined in SQL, and is
+    rounded to whole cents, so sums stay exact integer SUMs; rows older than
+    the stored history use the current rate.
+    """
+    user = await db.run_sync(reference_data.user_settings)
+    ledger_currency = (user and user.currency) or settings.default_currency
+    if not currency or currency == ledger_currency:
+        return Transaction.amount
+    if currency not in SUPPORTED_CURRENCIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported currency. Supported: {SUPPORTED_CURRENCIES}"
+        )
+
+    # May probe the shared rate snapshot, which is blocking I/O
+    current_rate = await asyncio.to_thread(get_exchange_rate, ledger_currency, currency)
+    rate = func.coalesce(rate_as_of(ledger_currency, currency, Transaction.date), current_rate)
+    return cast(func.round(Transaction.amount * rate), Cents)
+
 
 @router.get("/monthly-summary")
-def monthly_summary(month: str = Query(..., description="Format: YYYY-MM"), db: Session = Depends(get_db)):
+async def monthly_summary(
+    month: str = Query(..., description="Format: YYYY-MM"),
+    currency: str | None = CURRENCY_QUERY,
+    db: AsyncSession = Depends(get_async_read_db)
+):
     year, month_num = month.split("-")
     start_date = f"{year}-{month_num}-01"
 
@@ -21,17 +56,18 @@ def monthly_summary(month: str = Query(..., description="Format: YYYY-MM"), db:
     else:
         end_date = f"{year}-{int(month_num)+1:02d}-01"
 
-    income = db.query(func.sum(Transaction.amount)).filter(
+    amount = await _amount_in(currency, db)
+    income = await db.scalar(select(func.sum(amount)).where(
         Transaction.type == "income",
         Transaction.date >= start_date,
         Transaction.date < end_date
-    ).scalar() or 0.0
+    )) or 0
 
-    expenses = db.query(func.sum(Transaction.amount)).filter(
+    expenses = await db.scalar(select(func.sum(amount)).where(
         Transaction.type == "expense",
         Transaction.date >= start_date,
         Transaction.date < end_date
-    ).scalar() or 0.0
+    )) or 0
 
     return {
         "month": month,
@@ -42,7 +78,11 @@ def monthly_summary(month: str = Query(..., description="Format: YYYY-MM"), db:
 
 
 @router.get("/category-breakdown")
-def category_breakdown(month: str = Query(..., description="Format: YYYY-MM"), db: Session = Depends(get_db)):
+async def category_breakdown(
+    month: str = Query(..., description="Format: YYYY-MM"),
+    currency: str | None = CURRENCY_QUERY,
+    db: AsyncSession = Depends(get_async_read_db)
+):
     year, month_num = month.split("-")
     start_date = f"{year}-{month_num}-01"
 
@@ -51,15 +91,16 @@ def category_breakdown(month: str = Query(..., description="Format: YYYY-MM"), d
     else:
         end_date = f"{year}-{int(month_num)+1:02d}-01"
 
-    results = db.query(
+    amount = await _amount_in(currency, db)
+    results = (await db.execute(select(
         Category.id,
         Category.name,
         Category.type,
-        func.sum(Transaction.amount).label("total")
-    ).join(Transaction).filter(
+        func.sum(amount).label("total")
+    ).join(Transaction).where(
         Transaction.date >= start_date,
         Transaction.date < end_date
-    ).group_by(Category.id).all()
+    ).group_by(Category.id))).all()
 
     return [
         {
@@ -73,7 +114,12 @@ def category_breakdown(month: str = Query(..., description="Format: YYYY-MM"), d
 
 
 @router.get("/trends")
-def trends(months: int = Query(6, ge=1, le=24), db: Session = Depends(get_db)):
+async def trends(
+    months: int = Query(6, ge=1, le=24),
+    currency: str | None = CURRENCY_QUERY,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    amount = await _amount_in(currency, db)
     today = date.today()
     result = []
 
@@ -88,17 +134,17 @@ def trends(months: int = Query(6, ge=1, le=24), db: Session = Depends(get_db)):
         else:
             end_date = f"{year}-{int(month_num)+1:02d}-01"
 
-        income = db.query(func.sum(Transaction.amount)).filter(
+        income = await db.scalar(select(func.sum(amount)).where(
             Transaction.type == "income",
             Transaction.date >= start_date,
             Transaction.date < end_date
-        ).scalar() or 0.0
+        )) or 0
 
-        expenses = db.query(func.sum(Transaction.amount)).filter(
+        expenses = await db.scalar(select(func.sum(amount)).where(
             Transaction.type == "expense",
             Transaction.date >= start_date,
             Transaction.date < end_date
-        ).scalar() or 0.0
+        )) or 0
 
         result.append({
             "month": month_str,
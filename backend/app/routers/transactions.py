@@ -1,9 +1,11 @@
 from datetime import date
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
-from app.database import get_db
+from app.database import get_async_read_db, get_db
 from app.models import Transaction
 from app.schemas.transaction import TransactionCreate, TransactionUpdate, TransactionResponse
 
@@ -11,25 +13,25 @@ router = APIRouter()
 
 
 @router.get("", response_model=list[TransactionResponse])
-def list_transactions(
+async def list_transactions(
     start_date: date | None = Query(None),
     end_date: date | None = Query(None),
     category_id: int | None = Query(None),
     type: str | None = Query(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    query = db.query(Transaction)
+    query = select(Transaction).options(selectinload(Transaction.category))
 
     if start_date:
-        query = query.filter(Transaction.date >= start_date)
+        query = query.where(Transaction.date >= start_date)
     if end_date:
-        query = query.filter(Transaction.date <= end_date)
+        query = query.where(Transaction.date <= end_date)
     if category_id:
-        query = query.filter(Transaction.category_id == category_id)
+        query = query.where(Transaction.category_id == category_id)
     if type:
-        query = query.filter(Transaction.type == type)
+        query = query.where(Transaction.type == type)
 
-    return query.order_by(Transaction.date.desc()).all()
+    return (await db.scalars(query.order_by(Transaction.date.desc()))).all()
 
 
 @router.post("", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED)
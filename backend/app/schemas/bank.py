@@ -3,6 +3,7 @@ import datetime as dt
 from pydantic import BaseModel
 
 from app.schemas.category import CategoryResponse
+from app.utils.money import Money
 
 
 class BankConnectionCreate(BaseModel):
@@ -16,7 +17,7 @@ class BankConnectionResponse(BaseModel):
     bank_name: str
     account_name: str
     account_type: str
-    balance: float
+    balance: Money
     last_synced: dt.datetime | None
     is_active: bool
     created_at: dt.datetime
@@ -29,12 +30,13 @@ class PendingTransactionResponse(BaseModel):
     id: int
     bank_connection_id: int
     external_id: str
-    amount: float
+    amount: Money
     merchant_name: str
     date: str
     suggested_category_id: int | None
     suggested_category: CategoryResponse | None
     status: str
+    duplicate_of_id: int | None = None
     created_at: dt.datetime
 
     class Config:
@@ -45,9 +47,32 @@ class PendingTransactionImport(BaseModel):
     category_id: int
 
 
+class PendingBulkAction(BaseModel):
+    """Selects pending transactions for a bulk import or dismiss.
+
+    Filters are combined with AND; at least one must be given.
+    """
+    ids: list[int] | None = None
+    merchant_name: str | None = None
+    bank_connection_id: int | None = None
+    start_date: str | None = None  # YYYY-MM-DD, inclusive
+    end_date: str | None = None  # YYYY-MM-DD, inclusive
+    category_id: int | None = None  # Overrides suggested category on import
+
+
 class BankBalanceResponse(BaseModel):
     bank_connection_id: int
     bank_name: str
     account_name: str
     account_type: str
-    balance: float
+    balance: Money
+
+
+class BalanceHistoryPoint(BaseModel):
+    date: str  # Bucket start: YYYY-MM-DD, or YYYY-MM for monthly
+    balance: Money
+
+
+class BalanceHistoryResponse(BaseModel):
+    resolution: str  # "raw", "daily" or "monthly"
+    points: list[BalanceHistoryPoint]
@@ -3,11 +3,12 @@ from datetime import datetime
 from pydantic import BaseModel
 
 from app.schemas.category import CategoryResponse
+from app.utils.money import Money
 
 
 class BudgetBase(BaseModel):
     category_id: int
-    amount: float
+    amount: Money
     month: str  # Format: "YYYY-MM"
 
 
@@ -16,7 +17,7 @@ class BudgetCreate(BudgetBase):
 
 
 class BudgetUpdate(BaseModel):
-    amount: float
+    amount: Money
 
 
 class BudgetResponse(BudgetBase):
@@ -31,7 +32,7 @@ class BudgetResponse(BudgetBase):
 class BudgetStatus(BaseModel):
     category_id: int
     category_name: str
-    budgeted: float
-    spent: float
-    remaining: float
+    budgeted: Money
+    spent: Money
+    remaining: Money
     percentage_used: float
@@ -2,10 +2,12 @@ import datetime as dt
 
 from pydantic import BaseModel
 
+from app.utils.money import Money
+
 
 class GoalBase(BaseModel):
     name: str
-    target_amount: float
+    target_amount: Money
     deadline: dt.date
 
 
@@ -15,18 +17,18 @@ class GoalCreate(GoalBase):
 
 class GoalUpdate(BaseModel):
     name: str | None = None
-    target_amount: float | None = None
-    current_amount: float | None = None
+    target_amount: Money | None = None
+    current_amount: Money | None = None
     deadline: dt.date | None = None
 
 
 class GoalContribute(BaseModel):
-    amount: float
+    amount: Money
 
 
 class GoalResponse(GoalBase):
     id: int
-    current_amount: float
+    current_amount: Money
     created_at: dt.datetime
     progress_percentage: float
     days_remaining: int
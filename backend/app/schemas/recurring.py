@@ -3,10 +3,11 @@ import datetime as dt
 from pydantic import BaseModel
 
 from app.schemas.category import CategoryResponse
+from app.utils.money import Money
 
 
 class RecurringBase(BaseModel):
-    amount: float
+    amount: Money
     type: str  # "income" or "expense"
     category_id: int
     description: str | None = None
@@ -19,7 +20,7 @@ class RecurringCreate(RecurringBase):
 
 
 class RecurringUpdate(BaseModel):
-    amount: float | None = None
+    amount: Money | None = None
     type: str | None = None
     category_id: int | None = None
     description: str | None = None
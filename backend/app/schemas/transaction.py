@@ -3,10 +3,11 @@ import datetime as dt
 from pydantic import BaseModel
 
 from app.schemas.category import CategoryResponse
+from app.utils.money import Money
 
 
 class TransactionBase(BaseModel):
-    amount: float
+    amount: Money
     type: str  # "income" or "expense"
     category_id: int
     description: str | None = None
@@ -18,7 +19,7 @@ class TransactionCreate(TransactionBase):
 
 
 class TransactionUpdate(BaseModel):
-    amount: float | None = None
+    amount: Money | None = None
     type: str | None = None
     category_id: int | None = None
     description: str | None = None
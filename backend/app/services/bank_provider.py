@@ -0,0 +1,170 @@
+"""Bank provider adapters: where sync gets transactions and balances from."""
+
+import abc
+import asyncio
+import random
+from typing import Optional
+
+import httpx
+
+from app.config import settings
+from app.models import BankConnection
+from app.services.mock_bank_service import generate_mock_balance, generate_mock_transactions
+
+
+class BankProviderError(Exception):
+    """The bank provider could not be reached or returned an error."""
+
+
+class BankProvider(abc.ABC):
+    """Interface every provider implements.
+
+    Transactions are dicts shaped like generate_mock_transactions output.
+    """
+
+    @abc.abstractmethod
+    async def fetch_transactions(self, connection: BankConnection) -> list[dict]:
+        ...
+
+    @abc.abstractmethod
+    async def fetch_balance(self, connection: BankConnection) -> float:
+        ...
+
+    async def fetch_account(self, connection: BankConnection) -> tuple[list[dict], float]:
+        """Fetch transactions and balance concurrently."""
+        transactions, balance = await asyncio.gather(
+            self.fetch_transactions(connection),
+            self.fetch_balance(connection),
+        )
+        return transactions, balance
+
+    async def aclose(self) -> None:
+        pass
+
+
+class MockBankProvider(BankProvider):
+    """In-process mock: a random batch of transactions per sync."""
+
+    async def fetch_transactions(self, connection: BankConnection) -> list[dict]:
+        return generate_mock_transactions(count=random.randint(5, 15))
+
+    async def fetch_balance(self, connection: BankConnection) -> float:
+        return generate_mock_balance(connection.account_type)
+
+
+class HttpBankProvider(BankProvider):
+    """Talks to a bank API over HTTP with a pooled keep-alive client.
+
+    Transient failures (transport errors, 429, 5xx) are retried with jittered
+    exponential backoff; transaction lists are followed page by page.
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 10.0,
+        max_retries: int = 3,
+        page_size: int = 100,
+        max_connections: int = 20,
+        backoff_base: float = 0.2,
+        backoff_max: float = 5.0,
+    ):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.page_size = page_size
+        self.max_connections = max_connections
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # A client's connection pool belongs to the loop that created it
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+            self._loop = loop
+        return self._client
+
+    def _backoff(self, attempt: int) -> float:
+        return min(self.backoff_max, self.backoff_base * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+    async def _get(self, path: str, params: Optional[dict] = None) -> dict:
+        client = self._get_client()
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await client.get(path, params=params)
+            except httpx.TransportError as e:
+                if attempt == self.max_retries:
+                    raise BankProviderError(f"Bank provider unreachable: {e}") from e
+            else:
+                if response.status_code not in self.RETRY_STATUSES:
+                    if response.is_error:
+                        raise BankProviderError(f"Bank provider error: HTTP {response.status_code}")
+                    return response.json()
+                if attempt == self.max_retries:
+                    raise BankProviderError(f"Bank provider error: HTTP {response.status_code}")
+            await asyncio.sleep(self._backoff(attempt))
+        raise BankProviderError("Bank provider retries exhausted")
+
+    async def fetch_transactions(self, connection: BankConnection) -> list[dict]:
+        transactions = []
+        page = 1
+        while page:
+            data = await self._get(
+                f"/accounts/{connection.id}/transactions",
+                params={"page": page, "page_size": self.page_size},
+            )
+            transactions.extend(data["transactions"])
+            page = data.get("next_page")
+        return transactions
+
+    async def fetch_balance(self, connection: BankConnection) -> float:
+        data = await self._get(
+            f"/accounts/{connection.id}/balance",
+            params={"account_type": connection.account_type},
+        )
+        return data["balance"]
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_provider: Optional[BankProvider] = None
+
+
+def get_bank_provider() -> BankProvider:
+    """Return the configured provider, created on first use."""
+    global _provider
+    if _provider is None:
+        if settings.bank_provider == "http":
+            _provider = HttpBankProvider(
+                settings.bank_provider_url,
+                timeout=settings.bank_provider_timeout_seconds,
+                max_retries=settings.bank_provider_max_retries,
+                page_size=settings.bank_provider_page_size,
+                max_connections=settings.bank_provider_max_connections,
+            )
+        else:
+            _provider = MockBankProvider()
+    return _provider
+
+
+async def close_bank_provider() -> None:
+    """Close the provider's connection pool (called on app shutdown)."""
+    global _provider
+    if _provider is not None:
+        await _provider.aclose()
+        _provider = None
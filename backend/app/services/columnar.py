@@ -0,0 +1,210 @@
+"""Arrow/Parquet export and import of the ledger.
+
+pyarrow is optional (pip install -r requirements-parquet.txt); without it
+AVAILABLE is False and the endpoints answer 501.
+"""
+
+from typing import BinaryIO, Iterator, Optional
+
+from sqlalchemy import Integer, select, type_coerce
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.models import Category, Transaction
+from app.services.rate_history import convert_many
+from app.services.reference_data import reference_data
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pc = pq = None
+
+AVAILABLE = pa is not None
+
+BATCH_ROWS = 50_000
+
+# Columns an imported file must have
+IMPORT_COLUMNS = ("date", "amount", "type", "category")
+
+
+def transaction_schema(currency: Optional[str] = None) -> "pa.Schema":
+    """Export schema; with a currency, amounts converted to it are appended."""
+    fields = [
+        ("id", pa.int64()),
+        ("date", pa.date32()),
+        ("amount", pa.float64()),
+        ("type", pa.string()),
+        ("category_id", pa.int64()),
+        ("category", pa.string()),
+        ("description", pa.string()),
+    ]
+    if currency:
+        fields.append((f"amount_{currency.lower()}", pa.float64()))
+    return pa.schema(fields)
+
+
+def iter_transaction_batches(
+    engine: Engine,
+    start_date=None,
+    end_date=None,
+    currency: Optional[str] = None,
+    batch_rows: int = BATCH_ROWS,
+) -> Iterator["pa.RecordBatch"]:
+    """Stream the ledger as record batches from a server-side cursor.
+
+    With a currency, each batch also carries amounts converted to it at
+    their transaction dates, in one convert_many call per batch.
+    """
+    schema = transaction_schema(currency)
+    # Amounts are read as raw integer cents and scaled column-wise, skipping
+    # a Decimal per row
+    query = select(
+        Transaction.id,
+        Transaction.date,
+        type_coerce(Transaction.amount, Integer),
+        Transaction.type,
+        Transaction.category_id,
+        Category.name,
+        Transaction.description,
+    ).join(Category, Category.id == Transaction.category_id).order_by(Transaction.date, Transaction.id)
+    if start_date:
+        query = query.where(Transaction.date >= start_date)
+    if end_date:
+        query = query.where(Transaction.date <= end_date)
+
+    with engine.connect() as conn:
+        user = reference_data.user_settings(conn)
+        ledger_currency = (user and user.currency) or settings.default_currency
+        result = conn.execution_options(yield_per=batch_rows).execute(query)
+        for rows in result.partitions():
+            columns = list(zip(*rows))
+            columns[2] = pc.divide(pa.array(columns[2], pa.int64()), 100.0)
+            if currency:
+                columns.append(convert_many(conn, columns[2], ledger_currency, columns[1], currency))
+            yield pa.RecordBatch.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                schema=schema,
+            )
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to a generator."""
+
+    def __init__(self):
+        self.chunks: list[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def stream_transactions(
+    engine: Engine,
+    file_format: str,
+    start_date=None,
+    end_date=None,
+    currency: Optional[str] = None,
+) -> Iterator[bytes]:
+    """Encode the ledger as Parquet (one row group per batch) or an Arrow IPC stream.
+
+    Bytes are yielded after every batch, so memory stays bounded by one batch.
+    """
+    sink = _ChunkSink()
+    schema = transaction_schema(currency)
+    if file_format == "parquet":
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    for batch in iter_transaction_batches(engine, start_date, end_date, currency):
+        if file_format == "parquet":
+            writer.write_batch(batch, row_group_size=batch.num_rows)
+        else:
+            writer.write_batch(batch)
+        yield sink.drain()
+
+    writer.close()
+    yield sink.drain()
+
+
+def read_transaction_batches(source: BinaryIO, batch_rows: int = BATCH_ROWS) -> Iterator["pa.RecordBatch"]:
+    """Read a Parquet file in batches, with columns cast to the import types.
+
+    Raises ValueError when a required column is missing or can't be cast.
+    """
+    try:
+        parquet_file = pq.ParquetFile(source)
+    except pa.ArrowInvalid as e:
+        raise ValueError(f"Not a Parquet file: {e}") from e
+
+    names = set(parquet_file.schema_arrow.names)
+    missing = [column for column in IMPORT_COLUMNS if column not in names]
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    columns = list(IMPORT_COLUMNS) + (["description"] if "description" in names else [])
+    types = {"date": pa.date32(), "amount": pa.float64(), "type": pa.string(), "category": pa.string(), "description": pa.string()}
+    for batch in parquet_file.iter_batches(batch_size=batch_rows, columns=columns):
+        arrays = []
+        for name in columns:
+            try:
+                arrays.append(pc.cast(batch.column(name), types[name]))
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+                raise ValueError(f"Column '{name}' can't be read as {types[name]}: {e}") from e
+        if "description" not in names:
+            arrays.append(pa.nulls(batch.num_rows, pa.string()))
+        yield pa.RecordBatch.from_arrays(arrays, names=list(IMPORT_COLUMNS) + ["description"])
+
+
+def cents_array(amounts: "pa.Array") -> "pa.Array":
+    """Amounts as int64 whole cents, halves rounded away from zero like to_cents.
+
+    Float noise is snapped off first (1.005 * 100 is 100.49999...).
+    """
+    scaled = pc.round(pc.multiply(amounts, 100), ndigits=6)
+    return pc.cast(pc.round(scaled, round_mode="half_towards_infinity"), pa.int64())
+
+
+def validate_batch(batch: "pa.RecordBatch") -> tuple["pa.RecordBatch", list[int], list[tuple[int, str]]]:
+    """Split a batch into its valid rows and (row index, message) errors.
+
+    Checks are computed column-wise; also returns the valid rows' indices.
+    """
+    reasons = pc.if_else(
+        pc.is_null(batch.column("date")), "Missing date",
+        pc.if_else(
+            pc.fill_null(
+                pc.or_(pc.less_equal(batch.column("amount"), 0), pc.invert(pc.is_finite(batch.column("amount")))),
+                True,
+            ),
+            "Amount must be a positive finite number",
+            pc.if_else(
+                pc.fill_null(pc.is_in(batch.column("type"), value_set=pa.array(["income", "expense"])), False),
+                pa.scalar(None, pa.string()),
+                "Type must be 'income' or 'expense'",
+            ),
+        ),
+    )
+    valid_mask = pc.is_null(reasons)
+    invalid = pc.indices_nonzero(pc.invert(valid_mask))
+    errors = list(zip(invalid.to_pylist(), pc.take(reasons, invalid).to_pylist()))
+    return batch.filter(valid_mask), pc.indices_nonzero(valid_mask).to_pylist(), errors
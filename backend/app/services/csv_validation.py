@@ -0,0 +1,161 @@
+"""CSV row validation, split into chunks that can run in a process pool.
+
+Files are cut into byte chunks on record boundaries, so each chunk parses
+independently. Row numbers inside a chunk are relative; the caller adds the
+number of records in earlier chunks when merging results in order.
+"""
+
+import csv
+import io
+import math
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from typing import BinaryIO, Iterable, Iterator, NamedTuple, Optional
+
+from app.config import settings
+
+CHUNK_BYTES = 2 * 1024 * 1024
+
+
+class ChunkResult(NamedTuple):
+    rows: list[tuple]  # (index, date, amount, type, category, description)
+    errors: list[tuple[int, str]]  # (index, message), capped at max_errors
+    error_count: int
+    record_count: int
+
+
+def parse_iso_date(value: str) -> date:
+    """Parse YYYY-MM-DD without strptime; other shapes fall back to it."""
+    if len(value) == 10 and value[4] == "-" and value[7] == "-":
+        try:
+            return date(int(value[:4]), int(value[5:7]), int(value[8:]))
+        except ValueError:
+            pass
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def validate_row(tx_date: str, amount: str, tx_type: str) -> tuple[str, float]:
+    """Validate one row's fields, raising ValueError with a user-facing message.
+
+    Returns the normalized date string and the parsed amount.
+    """
+    # Validate date
+    parsed_date = parse_iso_date(tx_date)
+
+    # Validate amount
+    parsed_amount = float(amount)
+    if not math.isfinite(parsed_amount) or parsed_amount <= 0:
+        raise ValueError("Amount must be a positive finite number")
+
+    # Validate type
+    if tx_type not in ("income", "expense"):
+        raise ValueError("Type must be 'income' or 'expense'")
+
+    return parsed_date.isoformat(), parsed_amount
+
+
+def validate_chunk(data: bytes, fieldnames: list[str], max_errors: int) -> ChunkResult:
+    """Parse and validate one chunk of CSV records (no header)."""
+    date_i = fieldnames.index("date")
+    amount_i = fieldnames.index("amount")
+    type_i = fieldnames.index("type")
+    category_i = fieldnames.index("category")
+    description_i = fieldnames.index("description") if "description" in fieldnames else None
+    width = len(fieldnames)
+
+    rows = []
+    errors = []
+    error_count = 0
+    index = 0
+    for record in csv.reader(io.StringIO(data.decode("utf-8"), newline="")):
+        if not record:
+            continue  # Blank lines aren't records
+        if len(record) < width:
+            record += [""] * (width - len(record))
+
+        try:
+            tx_date, amount = validate_row(record[date_i], record[amount_i], record[type_i])
+            rows.append((
+                index,
+                tx_date,
+                amount,
+                record[type_i],
+                record[category_i],
+                record[description_i] if description_i is not None else None,
+            ))
+        except ValueError as e:
+            error_count += 1
+            if len(errors) < max_errors:
+                errors.append((index, str(e)))
+        index += 1
+
+    return ChunkResult(rows, errors, error_count, index)
+
+
+def iter_record_chunks(raw: BinaryIO, chunk_bytes: int = CHUNK_BYTES) -> Iterator[bytes]:
+    """Read raw in chunks of about chunk_bytes that end on a record boundary.
+
+    A newline only ends a record when it sits outside quotes, i.e. after an
+    even number of quote characters ("" escapes keep the parity).
+    """
+    while True:
+        chunk = raw.read(chunk_bytes)
+        if not chunk:
+            return
+
+        chunk += raw.readline()
+        in_quotes = chunk.count(b'"') % 2 == 1
+        while in_quotes:
+            line = raw.readline()
+            if not line:
+                break
+            chunk += line
+            in_quotes ^= line.count(b'"') % 2 == 1
+        yield chunk
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    if _pool is None:
+        _pool_workers = settings.csv_parallel_workers or os.cpu_count() or 1
+        # Spawned, not forked: the server process has threads running
+        _pool = ProcessPoolExecutor(
+            max_workers=_pool_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def validate_chunks(chunks: Iterable[bytes], fieldnames: list[str], max_errors: int, parallel: bool) -> Iterator[ChunkResult]:
+    """Validate chunks in order, in the process pool when parallel is set.
+
+    At most two chunks per worker are in flight, so memory stays bounded.
+    """
+    if not parallel:
+        for chunk in chunks:
+            yield validate_chunk(chunk, fieldnames, max_errors)
+        return
+
+    pool = _get_pool()
+    in_flight = deque()
+    for chunk in chunks:
+        in_flight.append(pool.submit(validate_chunk, chunk, fieldnames, max_errors))
+        if len(in_flight) >= 2 * _pool_workers:
+            yield in_flight.popleft().result()
+    while in_flight:
+        yield in_flight.popleft().result()
+
+
+def shutdown_pool() -> None:
+    """Stop the worker processes (called on app shutdown)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
@@ -0,0 +1,156 @@
+"""Duplicate detection between bank imports, CSV imports and the ledger."""
+
+import hashlib
+import math
+import re
+from collections import Counter, defaultdict
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Transaction
+
+_NON_WORD = re.compile(r"[^a-z]+")
+
+# Date ranges per ledger query when loading candidates
+LOAD_RANGES_PER_QUERY = 200
+
+
+def normalize_description(description: Optional[str]) -> str:
+    """Lowercase and strip digits/punctuation so "STARBUCKS #123" matches "Starbucks"."""
+    if not description:
+        return ""
+    return " ".join(_NON_WORD.sub(" ", description.lower()).split())
+
+
+def description_hash(description: Optional[str]) -> int:
+    """Stable 64-bit hash of a normalized description."""
+    digest = hashlib.blake2b(normalize_description(description).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def amount_key(amount: float) -> int:
+    """Amount in cents, so float noise doesn't split equal amounts.
+
+    Raises ValueError for NaN or an infinite amount.
+    """
+    if not math.isfinite(amount):
+        raise ValueError(f"Amount must be a finite number, got {amount}")
+    return int(round(abs(amount) * 100))
+
+
+def row_hash(tx_date: str, amount: float, tx_type: str, description: Optional[str]) -> int:
+    """Stable 64-bit hash of an imported row's exact content (amount must be finite)."""
+    content = f"{tx_date}|{amount_key(amount)}|{tx_type}|{(description or '').strip()}"
+    digest = hashlib.blake2b(content.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def row_fingerprint(content_hash: int, occurrence: int) -> str:
+    """Fingerprint of the occurrence-th identical row in a file.
+
+    Counting occurrences keeps two genuine identical rows apart, while the
+    same rows in an overlapping export get the same fingerprints.
+    """
+    return f"{content_hash}:{occurrence}"
+
+
+def _day_range_filters(days: List[int]) -> Iterator:
+    """Filters on transactions.date covering sorted day ordinals, as merged ranges."""
+    ranges: List[List[int]] = []
+    for day in days:
+        if ranges and day == ranges[-1][1] + 1:
+            ranges[-1][1] = day
+        else:
+            ranges.append([day, day])
+
+    for offset in range(0, len(ranges), LOAD_RANGES_PER_QUERY):
+        yield or_(*(
+            Transaction.date.between(date.fromordinal(first), date.fromordinal(last))
+            for first, last in ranges[offset:offset + LOAD_RANGES_PER_QUERY]
+        ))
+
+
+def ledger_row_hashes(db: Session, dates: Iterable[date]) -> Counter:
+    """How many ledger rows on any of dates have each row_hash.
+
+    Rows entered by hand or imported from a bank carry no fingerprint, so a
+    file re-importing them is matched on content instead: its first n copies
+    of a row are already in the ledger when n ledger rows share its hash.
+    """
+    counts: Counter = Counter()
+    days = sorted({d.toordinal() for d in dates})
+    for date_filter in _day_range_filters(days):
+        rows = db.query(
+            Transaction.date,
+            Transaction.amount,
+            Transaction.type,
+            Transaction.description,
+        ).filter(date_filter)
+        counts.update(row_hash(row.date.isoformat(), row.amount, row.type, row.description) for row in rows)
+    return counts
+
+
+class DuplicateDetector:
+    """Hash index of ledger rows keyed by (amount, date bucket, description hash).
+
+    Buckets are window_days wide, so any row within the window of a probe
+    lives in the probe's bucket or one of its two neighbours.
+    """
+
+    def __init__(self, window_days: Optional[int] = None):
+        self.window_days = max(1, window_days or settings.duplicate_window_days)
+        self._index: Dict[Tuple[int, int, int], List[Tuple[date, int]]] = defaultdict(list)
+        self._loaded_days: Set[int] = set()  # Ordinals of ledger days already indexed
+
+    def _bucket(self, tx_date: date) -> int:
+        return tx_date.toordinal() // self.window_days
+
+    def add(self, transaction_id: int, amount: float, tx_date: date, description: Optional[str]) -> None:
+        key = (amount_key(amount), self._bucket(tx_date), description_hash(description))
+        self._index[key].append((tx_date, transaction_id))
+
+    def find(self, amount: float, tx_date: date, description: Optional[str]) -> Optional[int]:
+        """Return the id of a ledger row likely duplicating this one, if any."""
+        cents = amount_key(amount)
+        desc = description_hash(description)
+        bucket = self._bucket(tx_date)
+
+        for candidate in (bucket - 1, bucket, bucket + 1):
+            for other_date, transaction_id in self._index.get((cents, candidate, desc), ()):
+                if abs((other_date - tx_date).days) <= self.window_days:
+                    return transaction_id
+        return None
+
+    def load(self, db: Session, dates: Iterable[date]) -> None:
+        """Index the ledger rows within the window of any of dates.
+
+        Only days not indexed by an earlier call are queried, as merged
+        date ranges on the index on transactions.date, so the cost follows
+        the candidate dates rather than the span between them.
+        """
+        reach = range(-self.window_days, self.window_days + 1)
+        days = sorted({d.toordinal() + offset for d in set(dates) for offset in reach} - self._loaded_days)
+        if not days:
+            return
+        self._loaded_days.update(days)
+
+        for date_filter in _day_range_filters(days):
+            rows = db.query(
+                Transaction.id,
+                Transaction.amount,
+                Transaction.date,
+                Transaction.description,
+            ).filter(date_filter)
+            for row in rows:
+                self.add(row.id, row.amount, row.date, row.description)
+
+    @classmethod
+    def from_ledger(cls, db: Session, dates: Iterable[date], window_days: Optional[int] = None) -> "DuplicateDetector":
+        """Detector indexing the ledger rows that could collide with dates."""
+        detector = cls(window_days)
+        detector.load(db, dates)
+        return detector
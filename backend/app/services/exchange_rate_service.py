@@ -1,10 +1,27 @@
-"""Exchange rate service with multiple provider support and caching."""
-
+"""Exchange rate service with multiple provider support and caching.
+
+Every worker process keeps the rates in memory, backed by the shared
+exchange_rate_snapshots row: one worker at a time refreshes under a lease
+and saves the snapshot, and the others pick it up by checking its fetch
+time at most every EXCHANGE_RATE_SYNC_SECONDS.
+"""
+
+import asyncio
+import json
+import random
+import threading
+import time
 import httpx
+import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, Tuple, Optional
+from typing import Dict, Sequence, Tuple, Optional, Union
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from app.config import settings
+from app.database import engine
 from app.models.currency import SUPPORTED_CURRENCIES
+from app.models.exchange_rate import RateSnapshot
+from app.services.lease import acquire_lease, release_lease
 
 
 # Static fallback rates (approximate rates as of 2026)
@@ -17,21 +34,78 @@ STATIC_RATES: Dict[Tuple[str, str], float] = {
     ("GBP", "EUR"): 1.16,
 }
 
-# In-memory cache
+# In-memory cache, replaced (never mutated) under _state_lock so readers in
+# worker threads always see a matching cache and timestamp
 _rate_cache: Dict[Tuple[str, str], float] = {}
 _cache_timestamp: Optional[datetime] = None
+_state_lock = threading.Lock()
+
+# Row id of the persisted last-good snapshot, the fetch time of the one this
+# process last saw and when it last checked for a newer one (monotonic)
+SNAPSHOT_ID = 1
+_snapshot_seen: Optional[datetime] = None
+_synced_at = float("-inf")
+
+# Held by the worker refreshing from the provider; the others wait for its snapshot
+REFRESH_LEASE = "exchange-rate-refresh"
+PEER_POLL_SECONDS = 0.25
+
+# Single-flight refresh: concurrent callers await the one in-flight task
+_inflight: Optional[asyncio.Task] = None
+
+# Consecutive failed refreshes and when the provider may be tried again
+_failures = 0
+_retry_at: Optional[datetime] = None
+BACKOFF_BASE_SECONDS = 5
+BACKOFF_MAX_SECONDS = 15 * 60
+
+# Row/column of each currency in the rate matrix; the extra last index is
+# for unsupported codes, which convert 1:1 like get_exchange_rate does
+CURRENCY_INDEX: Dict[str, int] = {c: i for i, c in enumerate(SUPPORTED_CURRENCIES)}
+UNSUPPORTED_INDEX = len(SUPPORTED_CURRENCIES)
+
+# Rate matrix built from _rate_cache, rebuilt when the cache is replaced
+_matrix: Optional[np.ndarray] = None
+_matrix_source: Optional[Tuple[int, Optional[datetime]]] = None
+
+# Background refreshes run at a random point in this fraction of the TTL,
+# so workers started together don't hit the provider together
+REFRESH_AHEAD_WINDOW = (0.75, 0.9)
+MIN_REFRESH_INTERVAL_SECONDS = 30
+
+# Shared keep-alive client, closed on app shutdown
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the pooled client for provider requests."""
+    global _client, _client_loop
+    # A client's connection pool belongs to the loop that created it
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = httpx.AsyncClient(timeout=settings.exchange_rate_timeout_seconds)
+        _client_loop = loop
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the pooled client (called on app shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
 
 
 async def fetch_frankfurter_rates(base: str = "USD") -> Dict[str, float]:
     """Fetch rates from Frankfurter API (free, no API key required)."""
     targets = ",".join([c for c in SUPPORTED_CURRENCIES if c != base])
-    url = f"https://api.frankfurter.app/latest?from={base}&to={targets}"
+    url = f"{settings.frankfurter_url}/latest?from={base}&to={targets}"
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.get(url)
-        response.raise_for_status()
-        data = response.json()
-        return data.get("rates", {})
+    response = await get_http_client().get(url)
+    response.raise_for_status()
+    data = response.json()
+    return data.get("rates", {})
 
 
 async def fetch_exchangerate_api_rates(base: str = "USD") -> Dict[str, float]:
@@ -41,17 +115,16 @@ async def fetch_exchangerate_api_rates(base: str = "USD") -> Dict[str, float]:
 
     url = f"https://v6.exchangerate-api.com/v6/{settings.exchange_rate_api_key}/latest/{base}"
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.get(url)
-        response.raise_for_status()
-        data = response.json()
+    response = await get_http_client().get(url)
+    response.raise_for_status()
+    data = response.json()
 
-        if data.get("result") != "success":
-            raise ValueError(f"API error: {data.get('error-type', 'unknown')}")
+    if data.get("result") != "success":
+        raise ValueError(f"API error: {data.get('error-type', 'unknown')}")
 
-        # Filter to only supported currencies
-        all_rates = data.get("conversion_rates", {})
-        return {k: v for k, v in all_rates.items() if k in SUPPORTED_CURRENCIES}
+    # Filter to only supported currencies
+    all_rates = data.get("conversion_rates", {})
+    return {k: v for k, v in all_rates.items() if k in SUPPORTED_CURRENCIES}
 
 
 async def fetch_live_rates(base: str = "USD") -> Dict[str, float]:
@@ -64,8 +137,43 @@ async def fetch_live_rates(base: str = "USD") -> Dict[str, float]:
         return {}
 
 
-def get_exchange_rate(from_currency: str, to_currency: str) -> float:
-    """Get exchange rate with caching. Synchronous version using cached data."""
+def derive_cross_rates(base: str, rates: Dict[str, float]) -> Dict[Tuple[str, str], float]:
+    """Triangulate every supported pair from one base's rates.
+
+    X -> Y is (base -> Y) / (base -> X); pairs involving the base itself
+    are the quoted rate and its inverse.
+    """
+    base_rates = {currency: rate for currency, rate in rates.items() if currency in SUPPORTED_CURRENCIES and rate}
+    base_rates[base] = 1.0
+
+    derived: Dict[Tuple[str, str], float] = {}
+    for source, source_rate in base_rates.items():
+        for target, target_rate in base_rates.items():
+            if source != target:
+                derived[(source, target)] = round(target_rate / source_rate, 6)
+    return derived
+
+
+async def fetch_all_rates() -> Dict[Tuple[str, str], float]:
+    """Fetch rates for every supported pair.
+
+    One request per base, concurrently; or, with a pivot currency configured,
+    a single request with cross rates derived from it.
+    """
+    pivot = settings.exchange_rate_pivot_currency
+    if pivot:
+        return derive_cross_rates(pivot, await fetch_live_rates(pivot))
+
+    results = await asyncio.gather(*(fetch_live_rates(base) for base in SUPPORTED_CURRENCIES))
+    new_cache: Dict[Tuple[str, str], float] = {}
+    for base, rates in zip(SUPPORTED_CURRENCIES, results):
+        for target, rate in rates.items():
+            if target != base:
+                new_cache[(base, target)] = rate
+    return new_cache
+
+
+def _lookup_rate(cache: Dict[Tuple[str, str], float], from_currency: str, to_currency: str) -> float:
     if from_currency == to_currency:
         return 1.0
 
@@ -75,59 +183,240 @@ def get_exchange_rate(from_currency: str, to_currency: str) -> float:
 
     # Check cache first
     cache_key = (from_currency, to_currency)
-    if cache_key in _rate_cache:
-        return _rate_cache[cache_key]
+    if cache_key in cache:
+        return cache[cache_key]
 
     # Fall back to static rates
     return STATIC_RATES.get(cache_key, 1.0)
 
 
-async def refresh_rates() -> bool:
-    """
-    Refresh rates from live provider.
-    Returns True if rates were successfully refreshed, False otherwise.
-    """
+def get_exchange_rate(from_currency: str, to_currency: str) -> float:
+    """Get exchange rate with caching. Synchronous version using cached data."""
+    sync_snapshot()
+    return _lookup_rate(_rate_cache, from_currency, to_currency)
+
+
+def _store_rates(rates: Dict[Tuple[str, str], float], timestamp: Optional[datetime]) -> None:
     global _rate_cache, _cache_timestamp
+    with _state_lock:
+        _rate_cache = rates
+        _cache_timestamp = timestamp
 
-    # Use static rates if provider is set to static
-    if settings.exchange_rate_provider == "static":
-        _rate_cache = STATIC_RATES.copy()
-        _cache_timestamp = datetime.now()
-        return True
 
-    # Check if cache is still valid
+def is_cache_fresh() -> bool:
+    """Whether the cached rates are within the cache duration."""
     cache_duration = timedelta(minutes=settings.exchange_rate_cache_minutes)
-    if _cache_timestamp and datetime.now() - _cache_timestamp < cache_duration:
-        return True  # Cache still valid
+    return bool(_cache_timestamp and datetime.now() - _cache_timestamp < cache_duration)
+
+
+def cache_age_seconds() -> float:
+    """Seconds since the cached rates were fetched (infinite if never)."""
+    timestamp = _cache_timestamp
+    return (datetime.now() - timestamp).total_seconds() if timestamp else float("inf")
+
+
+def backoff_remaining() -> float:
+    """Seconds until the provider may be retried after failures (0 if now)."""
+    if _retry_at is None:
+        return 0.0
+    return max(0.0, (_retry_at - datetime.now()).total_seconds())
 
+
+def _record_result(success: bool) -> None:
+    """Reset the backoff on success; otherwise double it, with jitter."""
+    global _failures, _retry_at
+    with _state_lock:
+        if success:
+            _failures = 0
+            _retry_at = None
+        else:
+            _failures += 1
+            delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (_failures - 1))
+            _retry_at = datetime.now() + timedelta(seconds=delay * random.uniform(0.5, 1.0))
+
+
+def _refresh_lease_seconds() -> float:
+    return 2 * settings.exchange_rate_timeout_seconds
+
+
+async def _fetch_and_store() -> bool:
+    # Lease writes go through the sync engine, so they run in a worker thread
+    if not await asyncio.to_thread(acquire_lease, REFRESH_LEASE, _refresh_lease_seconds()):
+        return await _await_peer_refresh()
     try:
-        # Fetch rates for each base currency
-        new_cache: Dict[Tuple[str, str], float] = {}
-
-        for base in SUPPORTED_CURRENCIES:
-            rates = await fetch_live_rates(base)
-            for target, rate in rates.items():
-                if target != base:
-                    new_cache[(base, target)] = rate
-
-        if new_cache:
-            _rate_cache = new_cache
-            _cache_timestamp = datetime.now()
+        return await _fetch_from_provider()
+    finally:
+        await asyncio.to_thread(release_lease, REFRESH_LEASE)
+
+
+async def _await_peer_refresh() -> bool:
+    """Wait for the worker holding the refresh lease to save new rates."""
+    seen = _snapshot_seen
+    deadline = time.monotonic() + _refresh_lease_seconds()
+    while time.monotonic() < deadline:
+        await asyncio.sleep(PEER_POLL_SECONDS)
+        await sync_snapshot_async(force=True)
+        if _snapshot_seen != seen:
+            _record_result(True)
             return True
-        else:
-            # No rates fetched, keep existing or use static
-            if not _rate_cache:
-                _rate_cache = STATIC_RATES.copy()
-            return False
+    _record_result(False)
+    return False
+
 
+async def _fetch_from_provider() -> bool:
+    try:
+        new_cache = await fetch_all_rates()
     except Exception as e:
         # On error, keep existing cache or use static as fallback
         print(f"Warning: Failed to fetch exchange rates: {e}")
         if not _rate_cache:
-            _rate_cache = STATIC_RATES.copy()
-            _cache_timestamp = datetime.now()
+            _store_rates(STATIC_RATES.copy(), datetime.now())
+        _record_result(False)
+        return False
+
+    if not new_cache:
+        # No rates fetched, keep existing or use static
+        if not _rate_cache:
+            _store_rates(STATIC_RATES.copy(), _cache_timestamp)
+        _record_result(False)
         return False
 
+    fetched_at = datetime.now()
+    _store_rates(new_cache, fetched_at)
+    _record_result(True)
+    await asyncio.to_thread(save_snapshot, new_cache, fetched_at)
+    return True
+
+
+def save_snapshot(rates: Dict[Tuple[str, str], float], fetched_at: datetime) -> None:
+    """Persist live rates with their provider and fetch time.
+
+    A failed write only costs the next restart a fetch, so it's logged, not raised.
+    """
+    global _snapshot_seen
+    values = {
+        "provider": settings.exchange_rate_provider,
+        "pivot_currency": settings.exchange_rate_pivot_currency,
+        "fetched_at": fetched_at,
+        "rates": json.dumps({f"{f}_{t}": rate for (f, t), rate in rates.items()}),
+    }
+    statement = sqlite_insert(RateSnapshot).values(id=SNAPSHOT_ID, **values)
+    try:
+        with engine.begin() as conn:
+            conn.execute(statement.on_conflict_do_update(index_elements=["id"], set_=values))
+        _snapshot_seen = fetched_at
+    except Exception as e:
+        print(f"Warning: Failed to persist exchange rates: {e}")
+
+
+def load_snapshot() -> bool:
+    """Serve the persisted rates until the next refresh (called at startup).
+
+    The cache keeps the snapshot's fetch time, so the TTL carries over
+    restarts and a worker started within it doesn't call the provider.
+    Rates from a different provider are served but treated as stale.
+    Returns True if a snapshot was loaded.
+    """
+    global _snapshot_seen
+    if settings.exchange_rate_provider == "static":
+        return False
+    with engine.connect() as conn:
+        snapshot = conn.execute(select(RateSnapshot).where(RateSnapshot.id == SNAPSHOT_ID)).first()
+    if snapshot is None:
+        return False
+
+    rates = {tuple(pair.split("_", 1)): rate for pair, rate in json.loads(snapshot.rates).items()}
+    same_source = snapshot.provider == settings.exchange_rate_provider
+    _store_rates(rates, snapshot.fetched_at if same_source else None)
+    _snapshot_seen = snapshot.fetched_at
+    return True
+
+
+def sync_snapshot(force: bool = False) -> None:
+    """Load the shared snapshot if another worker saved a newer one.
+
+    A primary-key probe of its fetch time, at most every
+    EXCHANGE_RATE_SYNC_SECONDS unless forced.
+    """
+    global _synced_at
+    if not _snapshot_sync_due(force):
+        return
+    _synced_at = time.monotonic()
+    with engine.connect() as conn:
+        fetched_at = conn.execute(select(RateSnapshot.fetched_at).where(RateSnapshot.id == SNAPSHOT_ID)).scalar()
+    if fetched_at is not None and fetched_at != _snapshot_seen:
+        load_snapshot()
+
+
+def _snapshot_sync_due(force: bool) -> bool:
+    if settings.exchange_rate_provider == "static":
+        return False
+    return force or time.monotonic() - _synced_at >= settings.exchange_rate_sync_seconds
+
+
+async def sync_snapshot_async(force: bool = False) -> None:
+    """sync_snapshot for coroutines: when a probe is due it runs in a worker thread."""
+    if _snapshot_sync_due(force):
+        await asyncio.to_thread(sync_snapshot, force)
+
+
+async def refresh_rates(force: bool = False) -> bool:
+    """
+    Refresh rates from live provider.
+    Fresh rates are kept unless force is set. Only one refresh runs at a
+    time; concurrent callers share its result. After failures the provider
+    isn't called again until the backoff expires.
+    Returns True if rates were successfully refreshed, False otherwise.
+    """
+    global _inflight
+
+    # Use static rates if provider is set to static
+    if settings.exchange_rate_provider == "static":
+        _store_rates(STATIC_RATES.copy(), datetime.now())
+        return True
+
+    # Check if cache (or another worker's newer snapshot) is still valid
+    if not force:
+        await sync_snapshot_async()
+    if not force and is_cache_fresh():
+        return True
+
+    if _inflight is None or _inflight.done() or _inflight.get_loop() is not asyncio.get_running_loop():
+        if backoff_remaining() > 0:
+            return False
+        _inflight = asyncio.create_task(_fetch_and_store())
+    # Shielded so a cancelled caller doesn't cancel the refresh for the others
+    return await asyncio.shield(_inflight)
+
+
+def schedule_refresh() -> None:
+    """Refresh stale rates in the background; callers keep serving the cache.
+
+    Callers await sync_snapshot_async() first, so a newer snapshot saved by
+    another worker counts as fresh.
+    """
+    if is_cache_fresh() or backoff_remaining() > 0 or (_inflight and not _inflight.done()):
+        return
+    asyncio.create_task(refresh_rates())
+
+
+async def rate_refresh_loop() -> None:
+    """Keep the cache warm, refreshing a jittered while before it expires.
+
+    Refreshes are timed from the age of the newest snapshot, so rates loaded
+    at startup or saved by another worker aren't fetched again before due.
+    """
+    ttl = settings.exchange_rate_cache_minutes * 60
+    while True:
+        await sync_snapshot_async(force=True)
+        due_in = ttl * random.uniform(*REFRESH_AHEAD_WINDOW) - cache_age_seconds()
+        if due_in > 0:
+            await asyncio.sleep(max(MIN_REFRESH_INTERVAL_SECONDS, due_in))
+        elif await refresh_rates(force=True):
+            await asyncio.sleep(MIN_REFRESH_INTERVAL_SECONDS)
+        else:
+            await asyncio.sleep(max(1.0, backoff_remaining()))
+
 
 def convert_amount(amount: float, from_currency: str, to_currency: str) -> float:
     """Convert amount between currencies."""
@@ -135,8 +424,36 @@ def convert_amount(amount: float, from_currency: str, to_currency: str) -> float
     return round(amount * rate, 2)
 
 
+def rate_matrix() -> np.ndarray:
+    """Dense matrix where [i, j] is the rate from currency index i to j."""
+    global _matrix, _matrix_source
+    sync_snapshot()
+    with _state_lock:
+        cache, timestamp = _rate_cache, _cache_timestamp
+    source = (id(cache), timestamp)
+    if _matrix is None or _matrix_source != source:
+        size = len(SUPPORTED_CURRENCIES) + 1
+        matrix = np.ones((size, size))
+        for from_currency, i in CURRENCY_INDEX.items():
+            for to_currency, j in CURRENCY_INDEX.items():
+                matrix[i, j] = _lookup_rate(cache, from_currency, to_currency)
+        _matrix, _matrix_source = matrix, source
+    return _matrix
+
+
+def currency_indices(currencies: Union[str, Sequence[str]], count: int) -> np.ndarray:
+    """Rate-matrix indices for count rows of currency codes (or one code for all)."""
+    if isinstance(currencies, str):
+        return np.full(count, CURRENCY_INDEX.get(currencies, UNSUPPORTED_INDEX))
+    return np.fromiter(
+        (CURRENCY_INDEX.get(code, UNSUPPORTED_INDEX) for code in currencies),
+        dtype=np.intp,
+        count=count,
+    )
+
+
 def get_all_rates() -> Dict[str, float]:
-    """Get all cached exchange rates."""
+    """Get all cached exchange rates (as of the last snapshot sync)."""
     result = {}
     for (from_curr, to_curr), rate in _rate_cache.items():
         result[f"{from_curr}_{to_curr}"] = rate
@@ -150,16 +467,17 @@ def get_all_rates() -> Dict[str, float]:
 
 
 def get_cache_info() -> Dict:
-    """Get cache status information."""
+    """Get cache status information (as of the last snapshot sync)."""
+    with _state_lock:
+        cache, timestamp = _rate_cache, _cache_timestamp
     return {
         "provider": settings.exchange_rate_provider,
-        "cached_at": _cache_timestamp.isoformat() if _cache_timestamp else None,
+        "cached_at": timestamp.isoformat() if timestamp else None,
         "cache_duration_minutes": settings.exchange_rate_cache_minutes,
-        "rates_count": len(_rate_cache),
+        "rates_count": len(cache),
     }
 
 
 def invalidate_cache():
     """Force cache invalidation for next refresh."""
-    global _cache_timestamp
-    _cache_timestamp = None
+    _store_rates(_rate_cache, None)
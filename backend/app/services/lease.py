@@ -0,0 +1,43 @@
+"""Leases for jobs that only one worker process should run at a time.
+
+A lease is a row in the leases table, taken with a single conditional
+upsert, so it works across `uvicorn --workers N` processes sharing the
+database. It expires on its own if the holder dies. Both functions do
+blocking database I/O, so async callers run them with asyncio.to_thread.
+"""
+
+import os
+import socket
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.database import engine
+from app.models import Lease
+
+# Identifies this process as a lease holder
+OWNER = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def acquire_lease(name: str, seconds: float) -> bool:
+    """Take or extend the lease for `seconds`; False if another process holds it."""
+    now = datetime.now()
+    statement = sqlite_insert(Lease).values(name=name, owner=OWNER, expires_at=now + timedelta(seconds=seconds))
+    statement = statement.on_conflict_do_update(
+        index_elements=["name"],
+        set_={"owner": statement.excluded.owner, "expires_at": statement.excluded.expires_at},
+        where=(Lease.expires_at <= now) | (Lease.owner == OWNER),
+    )
+    with engine.begin() as conn:
+        return conn.execute(statement).rowcount == 1
+
+
+def release_lease(name: str) -> None:
+    """Give up the lease early if this process holds it."""
+    with engine.begin() as conn:
+        conn.execute(
+            update(Lease)
+            .where(Lease.name == name, Lease.owner == OWNER)
+            .values(expires_at=datetime.now())
+        )
@@ -0,0 +1,177 @@
+"""Periodic database maintenance: retention, downsampling and vacuuming.
+
+Runs in the background when maintenance_interval_minutes > 0, or once from
+the command line:
+    python -m app.services.maintenance
+
+A database created before auto_vacuum was enabled needs a one-off full
+VACUUM before incremental vacuuming can reclaim pages. It rewrites the whole
+file, so run it while the app is stopped:
+    python -m app.services.maintenance --enable-auto-vacuum
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Dict
+
+from sqlalchemy import delete, func, insert, literal, select, text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.models import BalanceSnapshot, ImportBatch, ImportRow, PendingTransaction, ProcessedExternalId
+
+
+def compact_pending_transactions(db: Session, retention_days: int | None = None) -> int:
+    """Replace processed pending rows older than the retention with dedup keys.
+
+    The slim processed_external_ids table is what re-sync checks, so a
+    compacted transaction is still never offered for review again.
+    """
+    if retention_days is None:
+        retention_days = settings.pending_retention_days
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+
+    expired = [
+        PendingTransaction.status != "pending",
+        func.coalesce(PendingTransaction.processed_at, PendingTransaction.created_at) < cutoff,
+    ]
+    db.execute(
+        insert(ProcessedExternalId).prefix_with("OR IGNORE").from_select(
+            ["bank_connection_id", "external_id", "status"],
+            select(
+                PendingTransaction.bank_connection_id,
+                PendingTransaction.external_id,
+                PendingTransaction.status,
+            ).where(*expired),
+        )
+    )
+    result = db.execute(delete(PendingTransaction).where(*expired))
+    db.commit()
+    return result.rowcount
+
+
+def _downsample_balances(db: Session, source: str, target: str, bucket, cutoff: datetime) -> int:
+    """Collapse source-tier snapshots older than cutoff to the last one per bucket."""
+    expired = [BalanceSnapshot.resolution == source, BalanceSnapshot.recorded_at < cutoff]
+
+    # SQLite returns the bare balance column from the row holding MAX(recorded_at)
+    closing = select(
+        BalanceSnapshot.bank_connection_id,
+        BalanceSnapshot.balance,
+        func.max(BalanceSnapshot.recorded_at),
+        literal(target),
+    ).where(*expired).group_by(BalanceSnapshot.bank_connection_id, bucket)
+
+    db.execute(insert(BalanceSnapshot).from_select(
+        ["bank_connection_id", "balance", "recorded_at", "resolution"], closing
+    ))
+    result = db.execute(delete(BalanceSnapshot).where(*expired))
+    return result.rowcount
+
+
+def downsample_balance_snapshots(db: Session) -> int:
+    """Apply tiered retention to balance history.
+
+    Raw snapshots older than balance_raw_retention_days become one closing
+    balance per day; daily ones older than balance_daily_retention_days become
+    one per month. Returns the number of snapshots removed.
+    """
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    daily_cutoff = today - timedelta(days=settings.balance_raw_retention_days)
+    monthly_cutoff = (today - timedelta(days=settings.balance_daily_retention_days)).replace(day=1)
+
+    removed = _downsample_balances(
+        db, "raw", "daily", func.date(BalanceSnapshot.recorded_at), daily_cutoff
+    )
+    removed += _downsample_balances(
+        db, "daily", "monthly", func.strftime("%Y-%m", BalanceSnapshot.recorded_at), monthly_cutoff
+    )
+    db.commit()
+    return removed
+
+
+def purge_staged_imports(db: Session) -> int:
+    """Discard CSV imports left unconfirmed past the staging retention."""
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.import_staging_retention_hours)
+    expired = select(ImportBatch.id).where(ImportBatch.status == "staged", ImportBatch.created_at < cutoff)
+
+    db.execute(delete(ImportRow).where(ImportRow.import_id.in_(expired)))
+    result = db.execute(delete(ImportBatch).where(ImportBatch.id.in_(expired)))
+    db.commit()
+    return result.rowcount
+
+
+def incremental_vacuum(pages: int | None = None) -> bool:
+    """Return up to pages free pages to the filesystem.
+
+    Does nothing, and returns False, until auto_vacuum is INCREMENTAL.
+    """
+    if engine.dialect.name != "sqlite":
+        return False
+    if pages is None:
+        pages = settings.maintenance_vacuum_pages
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if conn.execute(text("PRAGMA auto_vacuum")).scalar() != 2:  # 2 = INCREMENTAL
+            return False
+        conn.execute(text(f"PRAGMA incremental_vacuum({int(pages)})"))
+    return True
+
+
+def enable_auto_vacuum() -> None:
+    """Switch the database to auto_vacuum=INCREMENTAL with a full VACUUM."""
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if conn.execute(text("PRAGMA auto_vacuum")).scalar() != 2:
+            conn.execute(text("PRAGMA auto_vacuum = INCREMENTAL"))
+            conn.execute(text("VACUUM"))
+
+
+def run_maintenance() -> Dict[str, int]:
+    """Run every maintenance step once."""
+    db = SessionLocal()
+    try:
+        compacted = compact_pending_transactions(db)
+        downsampled = downsample_balance_snapshots(db)
+        purged = purge_staged_imports(db)
+    finally:
+        db.close()
+
+    if not incremental_vacuum():
+        print("Warning: auto_vacuum is off, so no pages were freed; run python -m app.services.maintenance --enable-auto-vacuum")
+    return {
+        "pending_compacted": compacted,
+        "balance_snapshots_downsampled": downsampled,
+        "staged_imports_purged": purged,
+    }
+
+
+async def maintenance_loop() -> None:
+    """Run maintenance at startup and then every maintenance_interval_minutes until cancelled."""
+    interval = settings.maintenance_interval_minutes * 60
+    while True:
+        try:
+            await asyncio.to_thread(run_maintenance)
+        except Exception as e:
+            print(f"Warning: Maintenance run failed: {e}")
+        await asyncio.sleep(interval)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Run database maintenance once.")
+    parser.add_argument(
+        "--enable-auto-vacuum", action="store_true",
+        help="Convert the database to auto_vacuum=INCREMENTAL first (full VACUUM; stop the app)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.enable_auto_vacuum:
+        enable_auto_vacuum()
+    print(run_maintenance())
+
+
+if __name__ == "__main__":
+    main()
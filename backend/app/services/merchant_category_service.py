@@ -0,0 +1,131 @@
+"""Learned merchant -> category model built from the user's import decisions."""
+
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import MerchantCategoryStat
+from app.services.duplicate_service import normalize_description
+
+
+def tokenize(merchant_name: str) -> List[str]:
+    """Split a merchant name into distinct normalized tokens."""
+    return list(dict.fromkeys(t for t in normalize_description(merchant_name).split() if len(t) > 1))
+
+
+class MerchantCategoryModel:
+    """Token -> category frequency index with a bounded in-memory LRU.
+
+    Counts live in merchant_category_stats; the LRU holds the hot tokens so
+    scoring a sync batch costs at most one query for the tokens it misses.
+    """
+
+    def __init__(self, max_tokens: int):
+        self.max_tokens = max_tokens
+        self._cache: "OrderedDict[str, Dict[int, int]]" = OrderedDict()
+        # Bumped on invalidation, so a lookup that raced a commit isn't cached
+        self._generation = 0
+        self._lock = Lock()
+
+    def _lookup(self, tokens: Iterable[str], db: Session) -> Dict[str, Dict[int, int]]:
+        tokens = set(tokens)
+        found: Dict[str, Dict[int, int]] = {}
+
+        with self._lock:
+            generation = self._generation
+            for token in tokens:
+                if token in self._cache:
+                    self._cache.move_to_end(token)
+                    found[token] = self._cache[token]
+
+        missing = tokens - found.keys()
+        if not missing:
+            return found
+
+        loaded: Dict[str, Dict[int, int]] = {token: {} for token in missing}
+        rows = db.query(MerchantCategoryStat).filter(MerchantCategoryStat.token.in_(missing)).all()
+        for row in rows:
+            loaded[row.token][row.category_id] = row.count
+
+        with self._lock:
+            if self._generation != generation:
+                found.update(loaded)
+                return found
+            for token, counts in loaded.items():
+                self._cache[token] = counts
+                self._cache.move_to_end(token)
+            while len(self._cache) > self.max_tokens:
+                self._cache.popitem(last=False)
+
+        found.update(loaded)
+        return found
+
+    def score(self, merchant_names: List[str], db: Session, valid_ids: Optional[set] = None) -> List[Optional[int]]:
+        """Return the best learned category for each merchant, or None.
+
+        All tokens in the batch are resolved in one pass before scoring.
+        """
+        token_lists = [tokenize(name) for name in merchant_names]
+        index = self._lookup((t for tokens in token_lists for t in tokens), db)
+
+        result: List[Optional[int]] = []
+        for tokens in token_lists:
+            scores: Counter = Counter()
+            for token in tokens:
+                scores.update(index.get(token, {}))
+            best = next(
+                (category_id for category_id, _ in scores.most_common()
+                 if valid_ids is None or category_id in valid_ids),
+                None,
+            )
+            result.append(best)
+        return result
+
+    def learn(self, merchant_name: str, category_id: int, db: Session, weight: int = 1) -> None:
+        """Record that merchant_name was imported under category_id.
+
+        The upsert joins the caller's transaction; cached tokens are dropped
+        once it commits, so the next lookup reads the committed counts.
+        """
+        tokens = tokenize(merchant_name)
+        if not tokens:
+            return
+
+        stmt = sqlite_insert(MerchantCategoryStat).values([
+            {
+                "token": token,
+                "category_id": category_id,
+                "count": weight,
+                "updated_at": datetime.now(timezone.utc),
+            }
+            for token in tokens
+        ])
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["token", "category_id"],
+            set_={
+                "count": MerchantCategoryStat.count + stmt.excluded.count,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        ))
+
+        event.listen(db, "after_commit", lambda session: self.invalidate(tokens), once=True)
+
+    def invalidate(self, tokens: Iterable[str]) -> None:
+        with self._lock:
+            for token in tokens:
+                self._cache.pop(token, None)
+            self._generation += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._generation += 1
+
+
+merchant_model = MerchantCategoryModel(settings.merchant_model_cache_size)
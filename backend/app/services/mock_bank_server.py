@@ -0,0 +1,91 @@
+"""Stand-in bank HTTP API for exercising HttpBankProvider offline.
+
+Serves MOCK_BANKS and deterministic MOCK_MERCHANTS transactions with
+configurable latency, error rate and maximum page size.
+
+Usage:
+    python -m app.services.mock_bank_server --port 8001 --latency-ms 150 --error-rate 0.05
+"""
+
+import argparse
+import asyncio
+import random
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Query
+
+from app.services.mock_bank_service import MOCK_BANKS, generate_mock_balance, generate_mock_transactions
+
+
+def create_app(
+    latency_ms: float = 0.0,
+    jitter_ms: float = 0.0,
+    error_rate: float = 0.0,
+    max_page_size: int = 100,
+    transactions_per_account: int = 50,
+    seed: int = 0,
+) -> FastAPI:
+    """Build the stand-in server; every response is delayed and may fail."""
+    app = FastAPI(title="Mock Bank API")
+
+    async def simulate_network() -> None:
+        delay = latency_ms + random.uniform(0, jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if error_rate and random.random() < error_rate:
+            raise HTTPException(status_code=503, detail="Injected failure")
+
+    @app.get("/banks")
+    async def list_banks():
+        await simulate_network()
+        return MOCK_BANKS
+
+    @app.get("/accounts/{account_id}/transactions")
+    async def list_transactions(
+        account_id: int,
+        page: int = Query(1, ge=1),
+        page_size: int = Query(100, ge=1),
+    ):
+        await simulate_network()
+        transactions = generate_mock_transactions(transactions_per_account, seed=seed * 1_000_003 + account_id)
+        page_size = min(page_size, max_page_size)
+        start = (page - 1) * page_size
+        end = start + page_size
+        return {
+            "transactions": transactions[start:end],
+            "next_page": page + 1 if end < len(transactions) else None,
+        }
+
+    @app.get("/accounts/{account_id}/balance")
+    async def get_balance(account_id: int, account_type: str = "checking"):
+        await simulate_network()
+        return {"balance": generate_mock_balance(account_type)}
+
+    return app
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the stand-in bank HTTP API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--max-page-size", type=int, default=100)
+    parser.add_argument("--transactions-per-account", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    app = create_app(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        max_page_size=args.max_page_size,
+        transactions_per_account=args.transactions_per_account,
+        seed=args.seed,
+    )
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,8 @@ from datetime import date, timedelta
 
 from sqlalchemy.orm import Session
 
-from app.models import Category
+from app.services.merchant_category_service import merchant_model
+from app.services.reference_data import reference_data
 
 # Mock merchants with their typical amounts and categories
 MOCK_MERCHANTS = [
@@ -63,36 +64,54 @@ def generate_mock_balance(account_type: str) -> float:
     return round(random.uniform(1000, 5000), 2)
 
 
-def suggest_category(merchant_name: str, db: Session) -> int | None:
-    """Suggest a category based on merchant name."""
-    # Find matching merchant
+def _static_category_name(merchant_name: str) -> str:
+    """Category name for a merchant from the static MOCK_MERCHANTS table."""
     for merchant in MOCK_MERCHANTS:
         if merchant["name"].lower() in merchant_name.lower():
-            # Find category in database
-            category = db.query(Category).filter(
-                Category.name == merchant["category"]
-            ).first()
-            if category:
-                return category.id
+            return merchant["category"]
+    return "Other Expense"
+
+
+def suggest_categories(merchant_names: list[str], db: Session) -> list[int | None]:
+    """Suggest a category for each merchant in a batch.
+
+    Learned import decisions win over the static merchant table. Categories
+    come from the reference data cache.
+    """
+    categories = reference_data.categories(db)
+    ids_by_name = {name: c.id for name, c in categories.by_name.items()}
+    valid_ids = set(categories.by_id)
+
+    learned = merchant_model.score(merchant_names, db, valid_ids)
+    return [
+        learned_id or ids_by_name.get(_static_category_name(name)) or ids_by_name.get("Other Expense")
+        for name, learned_id in zip(merchant_names, learned)
+    ]
+
+
+def suggest_category(merchant_name: str, db: Session) -> int | None:
+    """Suggest a category based on merchant name."""
+    return suggest_categories([merchant_name], db)[0]
 
-    # Default to "Other Expense" if no match
-    other = db.query(Category).filter(Category.name == "Other Expense").first()
-    return other.id if other else None
 
+def generate_mock_transactions(count: int = 10, seed: int | None = None) -> list[dict]:
+    """Generate a list of mock transactions.
 
-def generate_mock_transactions(count: int = 10) -> list[dict]:
-    """Generate a list of mock transactions."""
+    Pass a seed for a reproducible batch (external IDs included).
+    """
+    rng = random.Random(seed) if seed is not None else random
     transactions = []
     today = date.today()
 
     for _ in range(count):
-        merchant = random.choice(MOCK_MERCHANTS)
-        days_ago = random.randint(0, 30)
+        merchant = rng.choice(MOCK_MERCHANTS)
+        days_ago = rng.randint(0, 30)
         tx_date = today - timedelta(days=days_ago)
-        amount = round(random.uniform(merchant["min"], merchant["max"]), 2)
+        amount = round(rng.uniform(merchant["min"], merchant["max"]), 2)
+        external_id = uuid.UUID(int=rng.getrandbits(128), version=4) if seed is not None else uuid.uuid4()
 
         transactions.append({
-            "external_id": str(uuid.uuid4()),
+            "external_id": str(external_id),
             "merchant_name": merchant["name"],
             "amount": amount,
             "date": tx_date.isoformat(),
@@ -0,0 +1,103 @@
+"""Stand-in Frankfurter-compatible exchange-rate API for offline use and tests.
+
+Serves /latest and /{start}..{end} time series for SUPPORTED_CURRENCIES with
+deterministic rates that drift day to day. Like the ECB, it publishes no
+rates on weekends.
+
+Usage:
+    python -m app.services.mock_rate_server --port 8002 --latency-ms 50
+    FRANKFURTER_URL=http://localhost:8002 python -m app.services.rate_history --start 2024-01-01
+"""
+
+import argparse
+import asyncio
+import math
+import random
+from datetime import date, timedelta
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Query
+
+from app.models.currency import SUPPORTED_CURRENCIES
+
+# Approximate EUR rates the simulated series drift around
+EUR_ANCHORS = {"EUR": 1.0, "USD": 1.09, "GBP": 0.86}
+
+
+def simulated_rates(day: date, base: str, seed: int = 0) -> dict[str, float]:
+    """Rates from base to every other supported currency on day."""
+    eur = {"EUR": 1.0}
+    for i, currency in enumerate(SUPPORTED_CURRENCIES):
+        if currency == "EUR":
+            continue
+        noise = random.Random(f"{seed}:{currency}:{day.toordinal()}").uniform(-0.004, 0.004)
+        eur[currency] = EUR_ANCHORS.get(currency, 1.0) * (1 + 0.04 * math.sin(day.toordinal() / 90 + i) + noise)
+
+    return {
+        currency: round(rate / eur[base], 5)
+        for currency, rate in eur.items()
+        if currency != base
+    }
+
+
+def create_app(latency_ms: float = 0.0, seed: int = 0) -> FastAPI:
+    app = FastAPI(title="Mock Exchange Rate API")
+
+    def parse_request(base: str, to: str | None) -> list[str]:
+        if base not in SUPPORTED_CURRENCIES:
+            raise HTTPException(status_code=404, detail="not found")
+        return to.split(",") if to else [c for c in SUPPORTED_CURRENCIES if c != base]
+
+    async def simulate_network() -> None:
+        if latency_ms > 0:
+            await asyncio.sleep(latency_ms / 1000)
+
+    def last_business_day(day: date) -> date:
+        while day.weekday() >= 5:
+            day -= timedelta(days=1)
+        return day
+
+    @app.get("/latest")
+    async def latest(base: str = Query("EUR", alias="from"), to: str | None = None):
+        await simulate_network()
+        targets = parse_request(base, to)
+        day = last_business_day(date.today())
+        rates = simulated_rates(day, base, seed)
+        return {"amount": 1.0, "base": base, "date": day.isoformat(), "rates": {c: rates[c] for c in targets if c in rates}}
+
+    @app.get("/{period}")
+    async def time_series(period: str, base: str = Query("EUR", alias="from"), to: str | None = None):
+        await simulate_network()
+        targets = parse_request(base, to)
+        try:
+            start_text, end_text = period.split("..")
+            start = date.fromisoformat(start_text)
+            end = date.fromisoformat(end_text) if end_text else date.today()
+        except ValueError:
+            raise HTTPException(status_code=404, detail="not found")
+
+        series = {}
+        day = start
+        while day <= end:
+            if day.weekday() < 5:
+                rates = simulated_rates(day, base, seed)
+                series[day.isoformat()] = {c: rates[c] for c in targets if c in rates}
+            day += timedelta(days=1)
+        return {"amount": 1.0, "base": base, "start_date": start.isoformat(), "end_date": end.isoformat(), "rates": series}
+
+    return app
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the stand-in exchange-rate API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8002)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    uvicorn.run(create_app(latency_ms=args.latency_ms, seed=args.seed), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Historical exchange rates: bulk backfill, range queries and as-of conversion.
+
+Daily rates live in exchange_rates and are backfilled from the Frankfurter
+time-series API at FRANKFURTER_URL (app.services.mock_rate_server stands in
+for it offline). A day without a rate uses the latest earlier one.
+
+Usage:
+    python -m app.services.rate_history --start 2024-01-01 [--end 2024-12-31]
+"""
+
+import argparse
+import asyncio
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.models import ExchangeRate, Lease, RateSnapshot, SUPPORTED_CURRENCIES
+from app.services.exchange_rate_service import (
+    close_http_client,
+    currency_indices,
+    derive_cross_rates,
+    get_http_client,
+    rate_matrix,
+)
+
+# Longest range requested from the provider at once
+BACKFILL_SPAN_DAYS = 366
+UPSERT_CHUNK_ROWS = 5000
+
+
+async def fetch_rate_series(base: str, start: date, end: date) -> Dict[date, Dict[str, float]]:
+    """Daily rates from base to the other supported currencies, per published day."""
+    targets = ",".join(c for c in SUPPORTED_CURRENCIES if c != base)
+    response = await get_http_client().get(
+        f"{settings.frankfurter_url}/{start.isoformat()}..{end.isoformat()}",
+        params={"from": base, "to": targets},
+    )
+    response.raise_for_status()
+    return {date.fromisoformat(day): rates for day, rates in response.json().get("rates", {}).items()}
+
+
+def store_rates(rows: List[dict]) -> None:
+    """Upsert exchange_rates rows in chunks, in one transaction of its own session."""
+    statement = sqlite_insert(ExchangeRate)
+    statement = statement.on_conflict_do_update(
+        index_elements=["base", "quote", "date"],
+        set_={"rate": statement.excluded.rate},
+    )
+    with SessionLocal() as db:
+        for offset in range(0, len(rows), UPSERT_CHUNK_ROWS):
+            db.execute(statement, rows[offset:offset + UPSERT_CHUNK_ROWS])
+        db.commit()
+
+
+async def backfill_rates(start: date, end: date, base: Optional[str] = None) -> int:
+    """Store every supported pair for each day in [start, end]; returns rows written.
+
+    The range is fetched for one base in spans of up to BACKFILL_SPAN_DAYS,
+    concurrently, with cross rates derived from it. Existing days are overwritten.
+    The upsert runs in a worker thread, off the event loop.
+    """
+    base = base or settings.exchange_rate_pivot_currency or "USD"
+    spans = []
+    span_start = start
+    while span_start <= end:
+        span_end = min(end, span_start + timedelta(days=BACKFILL_SPAN_DAYS - 1))
+        spans.append((span_start, span_end))
+        span_start = span_end + timedelta(days=1)
+
+    results = await asyncio.gather(*(fetch_rate_series(base, s, e) for s, e in spans))
+
+    rows = [
+        {"base": source, "quote": target, "date": day, "rate": rate}
+        for series in results
+        for day, rates in series.items()
+        for (source, target), rate in derive_cross_rates(base, rates).items()
+    ]
+
+    await asyncio.to_thread(store_rates, rows)
+    return len(rows)
+
+
+def rate_as_of(base: str, quote: str, on):
+    """Correlated subquery for the base -> quote rate in effect on `on`.
+
+    `on` is usually a date column, so reports can convert inside their SQL;
+    each evaluation is one probe of the (base, quote, date) primary key.
+    NULL when there is no history that far back.
+    """
+    return (
+        select(ExchangeRate.rate)
+        .where(ExchangeRate.base == base, ExchangeRate.quote == quote, ExchangeRate.date <= on)
+        .order_by(ExchangeRate.date.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def rate_series(db: Union[Session, Connection], base: str, quote: str, start: date, end: date) -> List[Tuple[date, float]]:
+    """Stored rates in [start, end] plus the one in effect on start, by date."""
+    in_effect = select(func.max(ExchangeRate.date)).where(
+        ExchangeRate.base == base, ExchangeRate.quote == quote, ExchangeRate.date <= start
+    ).scalar_subquery()
+    return db.execute(
+        select(ExchangeRate.date, ExchangeRate.rate)
+        .where(
+            ExchangeRate.base == base,
+            ExchangeRate.quote == quote,
+            ExchangeRate.date >= func.coalesce(in_effect, start),
+            ExchangeRate.date <= end,
+        )
+        .order_by(ExchangeRate.date)
+    ).all()
+
+
+def convert_many(
+    db: Union[Session, Connection],
+    amounts: Sequence[float],
+    currencies: Union[str, Sequence[str]],
+    dates: Sequence[date],
+    to_currency: str,
+) -> np.ndarray:
+    """Convert each amount from its currency to to_currency at its date.
+
+    Rates start as the current ones gathered from the rate matrix. Then, per
+    source currency, the pair's series over the dates' range is loaded with
+    one indexed query and matched to the dates with a sorted as-of join
+    (searchsorted); dates before any history keep the current rate.
+    """
+    amounts = np.asarray(amounts, dtype=np.float64)
+    count = len(amounts)
+    days = np.fromiter((d.toordinal() for d in dates), dtype=np.int64, count=count)
+    rates = rate_matrix()[currency_indices(currencies, count), currency_indices(to_currency, count)]
+
+    if isinstance(currencies, str):
+        groups = [(currencies, np.ones(count, dtype=bool))]
+    else:
+        currencies = np.asarray(currencies, dtype=object)
+        groups = [(currency, currencies == currency) for currency in set(currencies.tolist())]
+
+    for currency, mask in groups:
+        if currency == to_currency or not mask.any():
+            continue
+        pair_days = days[mask]
+        series = rate_series(
+            db, currency, to_currency,
+            date.fromordinal(int(pair_days.min())), date.fromordinal(int(pair_days.max())),
+        )
+        if not series:
+            continue
+
+        series_days = np.fromiter((d.toordinal() for d, _ in series), dtype=np.int64, count=len(series))
+        series_rates = np.fromiter((r for _, r in series), dtype=np.float64, count=len(series))
+        position = np.searchsorted(series_days, pair_days, side="right") - 1
+        pair_rates = rates[mask]
+        known = position >= 0
+        pair_rates[known] = series_rates[position[known]]
+        rates[mask] = pair_rates
+
+    return np.round(amounts * rates, 2)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Backfill historical exchange rates.")
+    parser.add_argument("--start", type=date.fromisoformat, required=True, help="YYYY-MM-DD")
+    parser.add_argument("--end", type=date.fromisoformat, default=None, help="YYYY-MM-DD, defaults to today")
+    parser.add_argument("--base", default=None, help="Base to fetch, defaults to the pivot currency or USD")
+    args = parser.parse_args(argv)
+
+    for model in (ExchangeRate, RateSnapshot, Lease):
+        model.__table__.create(bind=engine, checkfirst=True)
+
+    async def run() -> int:
+        try:
+            return await backfill_rates(args.start, args.end or date.today(), args.base)
+        finally:
+            await close_http_client()
+
+    print(f"{asyncio.run(run())} rates stored")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Versioned in-process cache of reference data: categories and user settings.
+
+Writers call mark_changed(db, name) before committing. It bumps the name's
+row in cache_versions within the same transaction and drops this process's
+copy once the transaction commits. Readers serve their copy and probe the
+version row at most every REFERENCE_CACHE_CHECK_SECONDS, so changes
+committed by other worker processes are picked up too.
+"""
+
+import time
+from datetime import datetime
+from threading import Lock
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple, Union
+
+from sqlalchemy import event, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import CacheVersion, Category, UserSettings
+
+CATEGORIES = "categories"
+USER_SETTINGS = "user_settings"
+
+
+class CategoryEntry(NamedTuple):
+    id: int
+    name: str
+    type: str
+    is_default: bool
+    icon: Optional[str]
+    color: Optional[str]
+    created_at: datetime
+
+
+class CategorySnapshot(NamedTuple):
+    all: Tuple[CategoryEntry, ...]  # By id
+    by_id: Dict[int, CategoryEntry]
+    by_name: Dict[str, CategoryEntry]  # Names aren't unique; the first category with each
+
+
+class SettingsEntry(NamedTuple):
+    id: int
+    pin_hash: str
+    currency: Optional[str]
+
+
+def _load_categories(db: Union[Session, Connection]) -> CategorySnapshot:
+    rows = db.execute(select(*Category.__table__.c[CategoryEntry._fields]).order_by(Category.id)).all()
+    entries = tuple(CategoryEntry(*row) for row in rows)
+    by_name: Dict[str, CategoryEntry] = {}
+    for entry in entries:
+        by_name.setdefault(entry.name, entry)
+    return CategorySnapshot(entries, {entry.id: entry for entry in entries}, by_name)
+
+
+def _load_user_settings(db: Union[Session, Connection]) -> Optional[SettingsEntry]:
+    row = db.execute(
+        select(UserSettings.id, UserSettings.pin_hash, UserSettings.currency).order_by(UserSettings.id).limit(1)
+    ).first()
+    return SettingsEntry(*row) if row else None
+
+
+class ReferenceCache:
+    """Per-name cached values with the cache_versions version they were loaded at."""
+
+    def __init__(self):
+        self._values: Dict[str, Tuple[Any, int]] = {}
+        self._checked_at: Dict[str, float] = {}
+        # Bumped on local invalidation, so a load that raced a write isn't kept
+        self._generations: Dict[str, int] = {}
+        self._lock = Lock()
+
+    def _get(self, name: str, db: Union[Session, Connection], load: Callable) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._values.get(name)
+            generation = self._generations.get(name, 0)
+            if cached is not None and now - self._checked_at[name] < settings.reference_cache_check_seconds:
+                return cached[0]
+
+        # Version first: the data loaded after it is at least that new
+        version = db.execute(select(CacheVersion.version).where(CacheVersion.name == name)).scalar() or 0
+        value = cached[0] if cached is not None and cached[1] == version else load(db)
+        with self._lock:
+            if self._generations.get(name, 0) == generation:
+                self._values[name] = (value, version)
+                self._checked_at[name] = now
+        return value
+
+    def categories(self, db: Union[Session, Connection]) -> CategorySnapshot:
+        return self._get(CATEGORIES, db, _load_categories)
+
+    def user_settings(self, db: Union[Session, Connection]) -> Optional[SettingsEntry]:
+        return self._get(USER_SETTINGS, db, _load_user_settings)
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Drop this process's copy of name (or of everything)."""
+        with self._lock:
+            for key in [name] if name else list(self._values):
+                self._values.pop(key, None)
+                self._generations[key] = self._generations.get(key, 0) + 1
+
+    def mark_changed(self, db: Session, name: str) -> None:
+        """Record a change to name in db's transaction, to take effect on commit."""
+        statement = sqlite_insert(CacheVersion).values(name=name, version=1)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=["name"], set_={"version": CacheVersion.version + 1}
+        ))
+        event.listen(db, "after_commit", lambda session: self.invalidate(name), once=True)
+
+
+reference_data = ReferenceCache()
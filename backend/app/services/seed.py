@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 
 from app.models import Category
+from app.services.reference_data import CATEGORIES, reference_data
 
 DEFAULT_CATEGORIES = [
     # Expenses
@@ -33,4 +34,5 @@ def seed_default_categories(db: Session) -> None:
         category = Category(**cat_data, is_default=True)
         db.add(category)
 
+    reference_data.mark_changed(db, CATEGORIES)
     db.commit()
@@ -0,0 +1,252 @@
+"""Deterministic synthetic dataset generator for load testing.
+
+Builds years of ledger, recurring, budget, goal and pending bank data from
+a seed, so the same arguments always produce the same rows. Sampling is
+vectorized with NumPy and rows are written with chunked executemany inserts.
+
+Usage:
+    python -m app.services.synthetic_data --years 3 --per-day 1000 --seed 42
+"""
+
+import argparse
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import create_engine, insert
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import Base
+from app.models import (
+    BankConnection,
+    Budget,
+    Category,
+    Goal,
+    PendingTransaction,
+    RecurringTransaction,
+    Transaction,
+)
+from app.services.mock_bank_service import MOCK_BANKS, MOCK_MERCHANTS
+from app.services.seed import seed_default_categories
+
+# Relative frequency of each merchant type in the ledger
+TYPE_WEIGHTS = {"expense": 1.0, "income": 0.02}
+
+PENDING_STATUSES = np.array(["pending", "imported", "dismissed"])
+PENDING_STATUS_WEIGHTS = [0.2, 0.7, 0.1]
+
+FREQUENCIES = np.array(["daily", "weekly", "monthly"])
+FREQUENCY_WEIGHTS = [0.05, 0.25, 0.7]
+
+ACCOUNT_TYPES = {"Checking": "checking", "Savings": "savings", "Credit Card": "credit"}
+
+
+def _merchant_arrays(category_ids: dict[str, int]):
+    """Column arrays over MOCK_MERCHANTS for vectorized sampling."""
+    names = np.array([m["name"] for m in MOCK_MERCHANTS], dtype=object)
+    types = np.array([m["type"] for m in MOCK_MERCHANTS], dtype=object)
+    mins = np.array([m["min"] for m in MOCK_MERCHANTS], dtype=np.float64)
+    maxs = np.array([m["max"] for m in MOCK_MERCHANTS], dtype=np.float64)
+    cats = np.array([category_ids[m["category"]] for m in MOCK_MERCHANTS], dtype=np.int64)
+    weights = np.array([TYPE_WEIGHTS[m["type"]] for m in MOCK_MERCHANTS])
+    return names, types, mins, maxs, cats, weights / weights.sum()
+
+
+def _cents(amounts: np.ndarray) -> np.ndarray:
+    return np.rint(amounts * 100).astype(np.int64)
+
+
+def _sample_amounts(rng: np.random.Generator, idx: np.ndarray, mins: np.ndarray, maxs: np.ndarray) -> np.ndarray:
+    """Amounts in integer cents."""
+    return _cents(rng.uniform(mins[idx], maxs[idx]))
+
+
+def _sample_dates(rng: np.random.Generator, start: date, days: int, n: int) -> np.ndarray:
+    """n ISO dates uniformly within [start, start + days)."""
+    offsets = rng.integers(0, days, n)
+    return (np.datetime64(start.isoformat()) + offsets).astype("datetime64[D]").astype(str).astype(object)
+
+
+def _bulk_insert(conn: Connection, table, columns: list[str], *arrays, batch_size: int) -> int:
+    """Insert column arrays in chunks with a driver-level executemany.
+
+    Values go to sqlite3 as-is, bypassing per-row type processing, so dates
+    must already be ISO strings and amounts integer cents.
+    """
+    columns = columns + ["created_at"]
+    sql = str(insert(table).compile(dialect=conn.dialect, column_keys=columns))
+    created_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")
+
+    total = len(arrays[0]) if arrays else 0
+    for offset in range(0, total, batch_size):
+        chunk = [a[offset:offset + batch_size].tolist() for a in arrays]
+        rows = [values + (created_at,) for values in zip(*chunk)]
+        conn.exec_driver_sql(sql, rows)
+    return total
+
+
+def generate_dataset(
+    engine: Engine,
+    seed: int = 0,
+    years: int = 2,
+    per_day: int = 50,
+    connections: int = 4,
+    pending_per_connection: int = 500,
+    recurring: int = 20,
+    goals: int = 10,
+    end_date: date | None = None,
+    batch_size: int = 20000,
+) -> dict[str, int]:
+    """Populate the database behind engine with a seeded synthetic dataset.
+
+    Returns the number of rows created per table.
+    """
+    rng = np.random.default_rng(seed)
+    end_date = end_date or date.today()
+    days = 365 * years
+    start_date = end_date - timedelta(days=days - 1)
+
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        seed_default_categories(db)
+        categories = db.query(Category).all()
+        category_ids = {c.name: c.id for c in categories}
+        expense_ids = np.array([c.id for c in categories if c.type == "expense"], dtype=np.int64)
+
+    names, types, mins, maxs, cats, weights = _merchant_arrays(category_ids)
+    counts: dict[str, int] = {}
+
+    with engine.begin() as conn:
+        # Bulk-load speed over durability; the dataset is reproducible from the seed
+        conn.exec_driver_sql("PRAGMA synchronous=OFF")
+
+        # Ledger
+        n = days * per_day
+        idx = rng.choice(len(MOCK_MERCHANTS), size=n, p=weights)
+        counts["transactions"] = _bulk_insert(
+            conn, Transaction.__table__,
+            ["amount", "type", "category_id", "description", "date"],
+            _sample_amounts(rng, idx, mins, maxs), types[idx], cats[idx], names[idx],
+            _sample_dates(rng, start_date, days, n),
+            batch_size=batch_size,
+        )
+
+        # Recurring
+        idx = rng.choice(len(MOCK_MERCHANTS), size=recurring)
+        counts["recurring_transactions"] = _bulk_insert(
+            conn, RecurringTransaction.__table__,
+            ["amount", "type", "category_id", "description", "frequency", "next_run_date", "is_active"],
+            _sample_amounts(rng, idx, mins, maxs), types[idx], cats[idx], names[idx],
+            rng.choice(FREQUENCIES, size=recurring, p=FREQUENCY_WEIGHTS),
+            _sample_dates(rng, end_date, 30, recurring),
+            rng.random(recurring) < 0.9,
+            batch_size=batch_size,
+        )
+
+        # Budgets: one per expense category per month
+        months = np.array(sorted({d.strftime("%Y-%m") for d in (
+            start_date + timedelta(days=i) for i in range(days)
+        )}), dtype=object)
+        month_col = np.repeat(months, len(expense_ids))
+        category_col = np.tile(expense_ids, len(months))
+        counts["budgets"] = _bulk_insert(
+            conn, Budget.__table__,
+            ["category_id", "amount", "month"],
+            category_col,
+            _cents(np.round(rng.uniform(100, 1500, len(month_col)), -1)),
+            month_col,
+            batch_size=batch_size,
+        )
+
+        # Goals
+        targets = np.round(rng.uniform(500, 50000, goals), -2)
+        counts["goals"] = _bulk_insert(
+            conn, Goal.__table__,
+            ["name", "target_amount", "current_amount", "deadline"],
+            np.array([f"Goal {i + 1}" for i in range(goals)], dtype=object),
+            _cents(targets),
+            _cents(targets * rng.random(goals)),
+            _sample_dates(rng, end_date, 365 * 3, goals),
+            batch_size=batch_size,
+        )
+
+        # Bank connections and their pending transactions
+        accounts = [(bank["name"], account) for bank in MOCK_BANKS for account in bank["accounts"]]
+        connection_ids = []
+        for i in range(connections):
+            bank_name, account = accounts[i % len(accounts)]
+            account_type = ACCOUNT_TYPES[account]
+            balance = rng.uniform(-3000, 0) if account_type == "credit" else rng.uniform(500, 25000)
+            result = conn.execute(insert(BankConnection.__table__).values(
+                bank_name=bank_name,
+                account_name=account,
+                account_type=account_type,
+                balance=round(float(balance), 2),
+                is_active=True,
+                created_at=datetime.now(timezone.utc),
+            ))
+            connection_ids.append(result.inserted_primary_key[0])
+        counts["bank_connections"] = connections
+
+        n = connections * pending_per_connection
+        idx = rng.choice(len(MOCK_MERCHANTS), size=n, p=weights)
+        counts["pending_transactions"] = _bulk_insert(
+            conn, PendingTransaction.__table__,
+            ["bank_connection_id", "external_id", "amount", "merchant_name", "date", "suggested_category_id", "status"],
+            np.repeat(np.array(connection_ids, dtype=np.int64), pending_per_connection),
+            np.array([f"syn-{seed}-{i}" for i in range(n)], dtype=object),
+            _sample_amounts(rng, idx, mins, maxs),
+            names[idx],
+            _sample_dates(rng, end_date - timedelta(days=89), 90, n),
+            cats[idx],
+            rng.choice(PENDING_STATUSES, size=n, p=PENDING_STATUS_WEIGHTS),
+            batch_size=batch_size,
+        )
+
+    return counts
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic dataset for load testing.")
+    parser.add_argument("--database-url", default=settings.database_url)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--per-day", type=int, default=50, help="Ledger transactions per day")
+    parser.add_argument("--connections", type=int, default=4)
+    parser.add_argument("--pending-per-connection", type=int, default=500)
+    parser.add_argument("--recurring", type=int, default=20)
+    parser.add_argument("--goals", type=int, default=10)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None, help="YYYY-MM-DD, defaults to today")
+    parser.add_argument("--batch-size", type=int, default=20000)
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate all tables first")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.database_url)
+    if args.reset:
+        Base.metadata.drop_all(bind=engine)
+
+    started = time.perf_counter()
+    counts = generate_dataset(
+        engine,
+        seed=args.seed,
+        years=args.years,
+        per_day=args.per_day,
+        connections=args.connections,
+        pending_per_connection=args.pending_per_connection,
+        recurring=args.recurring,
+        goals=args.goals,
+        end_date=args.end_date,
+        batch_size=args.batch_size,
+    )
+    elapsed = time.perf_counter() - started
+
+    for table, count in counts.items():
+        print(f"{table}: {count}")
+    total = sum(counts.values())
+    print(f"{total} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Money as integer cents in the database and Decimal everywhere else."""
+
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Annotated
+
+from pydantic import AfterValidator, Field, PlainSerializer
+from sqlalchemy import Float, Integer
+from sqlalchemy.sql import operators
+from sqlalchemy.types import TypeDecorator
+
+CENT = Decimal("0.01")
+
+
+def quantize(value: Decimal) -> Decimal:
+    """Round to whole cents, halves away from zero."""
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def to_cents(value) -> int:
+    """Whole cents in an amount given as a Decimal, int, float or string."""
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    return int(quantize(value).scaleb(2))
+
+
+def from_cents(cents) -> Decimal:
+    return Decimal(cents).scaleb(-2)
+
+
+class Cents(TypeDecorator):
+    """Column type storing amounts as INTEGER cents, read back as Decimal.
+
+    Sums over these columns are exact integer SUMs in SQLite.
+    """
+
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else to_cents(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else from_cents(value)
+
+    def coerce_compared_value(self, op, value):
+        # Literals compared with or added to an amount are amounts; factors
+        # and divisors (exchange rates, counts) are plain numbers
+        if op in (operators.mul, operators.truediv):
+            return Float()
+        return self
+
+
+# Amounts in request and response schemas: parsed as Decimal (NaN and
+# Infinity rejected), rounded to cents, and written to JSON as numbers so
+# clients see the same shape as before
+Money = Annotated[
+    Decimal,
+    Field(allow_inf_nan=False),
+    AfterValidator(quantize),
+    PlainSerializer(float, return_type=float, when_used="json"),
+]
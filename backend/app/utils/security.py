@@ -1,4 +1,8 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from typing import Optional
 
 from jose import jwt
 from passlib.context import CryptContext
@@ -16,6 +20,54 @@ def verify_pin(plain_pin: str, hashed_pin: str) -> bool:
     return pwd_context.verify(plain_pin, hashed_pin)
 
 
+class PinHashingBusy(Exception):
+    """Raised when the PIN hashing queue is full."""
+
+
+# Dedicated pool for bcrypt, with a bound on hashes running or waiting on it
+_pin_executor: Optional[ThreadPoolExecutor] = None
+_pin_pending = 0
+_pin_lock = threading.Lock()
+
+
+def _get_pin_executor() -> ThreadPoolExecutor:
+    global _pin_executor
+    if _pin_executor is None:
+        _pin_executor = ThreadPoolExecutor(max_workers=settings.pin_hash_workers, thread_name_prefix="pin-hash")
+    return _pin_executor
+
+
+async def _run_pin_hashing(func, *args):
+    global _pin_pending
+    with _pin_lock:
+        if _pin_pending >= settings.pin_hash_workers + settings.pin_hash_queue_size:
+            raise PinHashingBusy()
+        _pin_pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_pin_executor(), func, *args)
+    finally:
+        with _pin_lock:
+            _pin_pending -= 1
+
+
+async def hash_pin_async(pin: str) -> str:
+    """hash_pin on the PIN hashing pool; raises PinHashingBusy if it's full."""
+    return await _run_pin_hashing(hash_pin, pin)
+
+
+async def verify_pin_async(plain_pin: str, hashed_pin: str) -> bool:
+    """verify_pin on the PIN hashing pool; raises PinHashingBusy if it's full."""
+    return await _run_pin_hashing(verify_pin, plain_pin, hashed_pin)
+
+
+def shutdown_pin_executor() -> None:
+    """Stop the PIN hashing pool (called on app shutdown)."""
+    global _pin_executor
+    if _pin_executor is not None:
+        _pin_executor.shutdown(cancel_futures=True)
+        _pin_executor = None
+
+
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(minutes=settings.access_token_expire_minutes)
@@ -0,0 +1,38 @@
+"""In-memory per-client attempt throttling."""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class AttemptThrottle:
+    """Token bucket per client key: `burst` attempts at once, refilled at `per_minute`.
+
+    Only the most recently seen `max_clients` keys are tracked, so memory
+    stays bounded under a flood of distinct clients.
+    """
+
+    def __init__(self, per_minute: float, burst: int, max_clients: int = 10000):
+        self.rate = per_minute / 60
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def attempt(self, key: str) -> float:
+        """Record an attempt; returns 0 if allowed, else seconds until one is."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0.0
+            else:
+                retry_after = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return retry_after
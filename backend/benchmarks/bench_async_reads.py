@@ -0,0 +1,188 @@
+"""Benchmark read throughput of the AsyncSession routes against their sync versions.
+
+Runs the app in a subprocess on a scratch database filled by the synthetic
+data generator, then has --clients concurrent clients loop over a mix of
+the ported read routes (a month of transactions, the monthly summary and
+budget status) for --seconds. The same mix is then run against
+benchmark-only copies of those routes written the way they were before the
+port: sync handlers on the shared threadpool with a pooled sync Session.
+
+Usage (from backend/):
+    python -m benchmarks.bench_async_reads --seconds 10 --clients 128
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+
+import httpx
+from sqlalchemy import create_engine
+
+MONTH = "2026-01"
+
+ROUTES = {
+    "async": [
+        ("/api/transactions", {"start_date": f"{MONTH}-01", "end_date": f"{MONTH}-07"}),
+        ("/api/reports/monthly-summary", {"month": MONTH}),
+        ("/api/budgets/status", {"month": MONTH}),
+    ],
+    "sync": [
+        ("/bench/sync/transactions", {"start_date": f"{MONTH}-01", "end_date": f"{MONTH}-07"}),
+        ("/bench/sync/monthly-summary", {"month": MONTH}),
+        ("/bench/sync/budget-status", {"month": MONTH}),
+    ],
+}
+
+
+def serve(port: int) -> None:
+    import uvicorn
+    from fastapi import Depends, Query
+    from sqlalchemy import func
+    from sqlalchemy.orm import Session
+
+    from app.database import get_read_db
+    from app.main import app
+    from app.models import Budget, Transaction
+    from app.schemas.budget import BudgetStatus
+    from app.schemas.transaction import TransactionResponse
+
+    def month_range(month: str) -> tuple[str, str]:
+        year, month_num = month.split("-")
+        if month_num == "12":
+            return f"{year}-12-01", f"{int(year)+1}-01-01"
+        return f"{year}-{month_num}-01", f"{year}-{int(month_num)+1:02d}-01"
+
+    @app.get("/bench/sync/transactions", response_model=list[TransactionResponse])
+    def sync_transactions(start_date: date, end_date: date, db: Session = Depends(get_read_db)):
+        return db.query(Transaction).filter(
+            Transaction.date >= start_date, Transaction.date <= end_date
+        ).order_by(Transaction.date.desc()).all()
+
+    @app.get("/bench/sync/monthly-summary")
+    def sync_monthly_summary(month: str = Query(...), db: Session = Depends(get_read_db)):
+        start_date, end_date = month_range(month)
+        totals = {}
+        for kind in ("income", "expense"):
+            totals[kind] = db.query(func.sum(Transaction.amount)).filter(
+                Transaction.type == kind, Transaction.date >= start_date, Transaction.date < end_date
+            ).scalar() or 0
+        return {"month": month, "income": totals["income"], "expenses": totals["expense"]}
+
+    @app.get("/bench/sync/budget-status", response_model=list[BudgetStatus])
+    def sync_budget_status(month: str = Query(...), db: Session = Depends(get_read_db)):
+        start_date, end_date = month_range(month)
+        result = []
+        for budget in db.query(Budget).filter(Budget.month == month).all():
+            spent = db.query(func.sum(Transaction.amount)).filter(
+                Transaction.category_id == budget.category_id,
+                Transaction.type == "expense",
+                Transaction.date >= start_date,
+                Transaction.date < end_date,
+            ).scalar() or 0
+            result.append(BudgetStatus(
+                category_id=budget.category_id,
+                category_name=budget.category.name,
+                budgeted=budget.amount,
+                spent=spent,
+                remaining=budget.amount - spent,
+                percentage_used=round(spent / budget.amount * 100, 1) if budget.amount > 0 else 0,
+            ))
+        return result
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else float("nan")
+
+
+async def client_loop(client: httpx.AsyncClient, routes, offset: int, deadline: float, latencies: list, counts: dict):
+    i = offset
+    while time.perf_counter() < deadline:
+        path, params = routes[i % len(routes)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            response = await client.get(path, params=params)
+            counts[response.status_code] = counts.get(response.status_code, 0) + 1
+        except httpx.HTTPError:
+            counts["error"] = counts.get("error", 0) + 1
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+
+
+async def run_phase(base_url: str, label: str, args) -> None:
+    limits = httpx.Limits(max_connections=args.clients)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        # Warm up connections and caches before measuring
+        await asyncio.gather(*(client.get(path, params=params) for path, params in ROUTES[label]))
+        latencies: list[float] = []
+        counts: dict = {}
+        started = time.perf_counter()
+        deadline = started + args.seconds
+        await asyncio.gather(*(
+            client_loop(client, ROUTES[label], n, deadline, latencies, counts) for n in range(args.clients)
+        ))
+        elapsed = time.perf_counter() - started
+
+    statuses = ", ".join(f"{code}: {count}" for code, count in sorted(counts.items(), key=str))
+    print(
+        f"{label:<6} requests={len(latencies):<6} {len(latencies) / elapsed:8.1f} req/s  "
+        f"p50={percentile(latencies, 0.5):8.1f} ms  p99={percentile(latencies, 0.99):8.1f} ms  ({statuses})"
+    )
+
+
+async def main_async(base_url: str, args) -> None:
+    for label in args.order.split(","):
+        await run_phase(base_url, label, args)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8014)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--clients", type=int, default=128)
+    parser.add_argument("--per-day", type=int, default=20, help="Ledger transactions per day in the scratch database")
+    parser.add_argument("--order", default="sync,async", help="Phases to run, comma-separated")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port)
+        return
+
+    from app.services.synthetic_data import generate_dataset
+
+    with tempfile.TemporaryDirectory() as scratch:
+        database_url = f"sqlite:///{scratch}/bench.db"
+        generate_dataset(create_engine(database_url), years=1, per_day=args.per_day, end_date=date(2026, 6, 30))
+
+        env = dict(os.environ, DATABASE_URL=database_url, MAINTENANCE_INTERVAL_MINUTES="0",
+                   EXCHANGE_RATE_PROVIDER="static")
+        server = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.bench_async_reads", "--serve", "--port", str(args.port)], env=env
+        )
+        base_url = f"http://127.0.0.1:{args.port}"
+        try:
+            while True:
+                if server.poll() is not None:
+                    raise SystemExit("server exited during startup")
+                try:
+                    httpx.get(f"{base_url}/api/health")
+                    break
+                except httpx.HTTPError:
+                    time.sleep(0.1)
+            asyncio.run(main_async(base_url, args))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Benchmark bank sync fetches through HttpBankProvider against the stand-in server.
+
+Starts app.services.mock_bank_server in a background thread with injected
+latency, then fetches N accounts sequentially and concurrently.
+
+Usage (from backend/):
+    python -m benchmarks.bench_bank_sync --accounts 50 --latency-ms 100 --page-size 25
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import uvicorn
+
+from app.services.bank_provider import HttpBankProvider
+from app.services.mock_bank_server import create_app
+
+
+def start_server(port: int, **options) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(create_app(**options), host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def run(provider: HttpBankProvider, accounts: int, concurrency: int) -> tuple[float, int]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def sync_one(account_id: int) -> int:
+        async with semaphore:
+            connection = SimpleNamespace(id=account_id, account_type="checking")
+            transactions, _ = await provider.fetch_account(connection)
+            return len(transactions)
+
+    started = time.perf_counter()
+    counts = await asyncio.gather(*(sync_one(i) for i in range(1, accounts + 1)))
+    return time.perf_counter() - started, sum(counts)
+
+
+async def main_async(args) -> None:
+    provider = HttpBankProvider(
+        f"http://127.0.0.1:{args.port}",
+        max_retries=args.max_retries,
+        page_size=args.page_size,
+        max_connections=args.concurrency,
+        backoff_base=0.05,
+    )
+    try:
+        for concurrency in (1, args.concurrency):
+            elapsed, transactions = await run(provider, args.accounts, concurrency)
+            print(
+                f"concurrency={concurrency:<4} {args.accounts} accounts, {transactions} transactions "
+                f"in {elapsed:.2f}s ({args.accounts / elapsed:.1f} accounts/s, {transactions / elapsed:.0f} tx/s)"
+            )
+    finally:
+        await provider.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8011)
+    parser.add_argument("--accounts", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--page-size", type=int, default=25)
+    parser.add_argument("--transactions-per-account", type=int, default=100)
+    parser.add_argument("--max-retries", type=int, default=3)
+    args = parser.parse_args()
+
+    server = start_server(
+        args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        max_page_size=args.page_size,
+        transactions_per_account=args.transactions_per_account,
+    )
+    try:
+        asyncio.run(main_async(args))
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Benchmark other routes' latency while the PIN login endpoint is flooded.
+
+Runs the app in a subprocess on a scratch database, sets a PIN, then probes
+GET /api/categories while concurrent clients hammer login with wrong PINs:
+first through the dedicated PIN hashing pool (POST /api/auth/login), then
+through a benchmark-only route that verifies on the shared threadpool the
+way login used to. Flood clients honor Retry-After on 429/503, so the
+number of logins in flight stays at --flood-clients rather than turning into
+a storm of cheap rejections. Per-client throttling is off unless --throttle
+is given, since every flood client shares 127.0.0.1.
+
+Usage (from backend/):
+    python -m benchmarks.bench_login_flood --seconds 10 --flood-clients 64
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+PIN = "1234"
+
+
+def serve(port: int) -> None:
+    import uvicorn
+    from fastapi import Depends, HTTPException
+    from sqlalchemy.orm import Session
+
+    from app.database import get_db
+    from app.main import app
+    from app.models import UserSettings
+    from app.schemas.user import PinLogin
+    from app.utils.security import verify_pin
+
+    @app.post("/bench/threadpool-login")
+    def threadpool_login(data: PinLogin, db: Session = Depends(get_db)):
+        user = db.query(UserSettings).first()
+        if not verify_pin(data.pin, user.pin_hash):
+            raise HTTPException(status_code=401, detail="Invalid PIN")
+        return {"ok": True}
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else float("nan")
+
+
+async def probe(client: httpx.AsyncClient, seconds: float, interval: float) -> list[float]:
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.get("/api/categories")
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def flood(client: httpx.AsyncClient, path: str, stop: asyncio.Event, counts: dict) -> None:
+    while not stop.is_set():
+        try:
+            response = await client.post(path, json={"pin": "0000"})
+            counts[response.status_code] = counts.get(response.status_code, 0) + 1
+            if "Retry-After" in response.headers:
+                await asyncio.sleep(float(response.headers["Retry-After"]) * random.uniform(0.5, 1.5))
+        except httpx.HTTPError:
+            counts["error"] = counts.get("error", 0) + 1
+
+
+async def run_phase(base_url: str, label: str, path: str | None, args) -> None:
+    # Separate clients, so probes never queue behind flood requests for a connection
+    limits = httpx.Limits(max_connections=args.flood_clients)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as flood_client, \
+            httpx.AsyncClient(base_url=base_url, timeout=60) as probe_client:
+        stop = asyncio.Event()
+        counts: dict = {}
+        flooders = [asyncio.create_task(flood(flood_client, path, stop, counts)) for _ in range(args.flood_clients if path else 0)]
+        await asyncio.sleep(0.5 if path else 0)
+        latencies = await probe(probe_client, args.seconds, args.probe_interval_ms / 1000)
+        stop.set()
+        await asyncio.gather(*flooders)
+
+    statuses = ", ".join(f"{code}: {count}" for code, count in sorted(counts.items(), key=str)) or "-"
+    print(
+        f"{label:<22} probes={len(latencies):<5} p50={percentile(latencies, 0.5):8.1f} ms "
+        f"p99={percentile(latencies, 0.99):8.1f} ms  login responses: {statuses}"
+    )
+
+
+async def main_async(base_url: str, args) -> None:
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        (await client.post("/api/auth/setup", json={"pin": PIN})).raise_for_status()
+
+    await run_phase(base_url, "idle", None, args)
+    await run_phase(base_url, "flood: pin hash pool", "/api/auth/login", args)
+    await run_phase(base_url, "flood: threadpool", "/bench/threadpool-login", args)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8013)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--flood-clients", type=int, default=64)
+    parser.add_argument("--probe-interval-ms", type=float, default=20.0)
+    parser.add_argument("--throttle", action="store_true", help="Keep per-client attempt throttling on")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port)
+        return
+
+    with tempfile.TemporaryDirectory() as scratch:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{scratch}/bench.db", MAINTENANCE_INTERVAL_MINUTES="0",
+                   EXCHANGE_RATE_PROVIDER="static")
+        if not args.throttle:
+            env["PIN_ATTEMPTS_PER_MINUTE"] = "0"
+        server = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.bench_login_flood", "--serve", "--port", str(args.port)], env=env
+        )
+        base_url = f"http://127.0.0.1:{args.port}"
+        try:
+            while True:
+                if server.poll() is not None:
+                    raise SystemExit("server exited during startup")
+                try:
+                    httpx.get(f"{base_url}/api/health")
+                    break
+                except httpx.HTTPError:
+                    time.sleep(0.1)
+            asyncio.run(main_async(base_url, args))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
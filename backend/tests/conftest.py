@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# The app reads its settings and opens its database at import time, so point
+# it at a throwaway database before any test imports it
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
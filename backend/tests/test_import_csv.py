@@ -0,0 +1,24 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_upload_reports_non_finite_amounts_as_row_errors():
+    csv = (
+        "date,amount,type,category,description\n"
+        "2026-01-06,12.50,expense,Food & Dining,Lunch\n"
+        "2026-01-07,nan,expense,Food & Dining,Not a number\n"
+        "2026-01-08,inf,expense,Food & Dining,Infinite\n"
+        "2026-01-09,-inf,expense,Food & Dining,Negative infinite\n"
+    )
+    response = client.post("/api/import/csv", files={"file": ("upload.csv", csv, "text/csv")})
+
+    assert response.status_code == 200
+    preview = response.json()
+    assert preview["total_rows"] == 4
+    assert preview["valid_rows"] == 1
+    assert preview["error_count"] == 3
+    assert [error.split(":")[0] for error in preview["errors"]] == ["Row 3", "Row 4", "Row 5"]
+    assert all("positive finite number" in error for error in preview["errors"])
@@ -13,7 +13,11 @@ import type {
 	BankInfo,
 	BankConnection,
 	PendingTransaction,
+	PendingBulkAction,
 	BankBalance,
+	BalanceHistory,
+	CSVPreview,
+	CSVImportRows,
 	ExchangeRates,
 	SupportedCurrency
 } from './types';
@@ -265,7 +269,7 @@ class ApiClient {
 	}
 
 	// Import
-	async uploadCSV(file: File): Promise<{ rows: unknown[]; errors: string[] }> {
+	async uploadCSV(file: File): Promise<CSVPreview> {
 		const formData = new FormData();
 		formData.append('file', file);
 
@@ -283,11 +287,19 @@ class ApiClient {
 		return response.json();
 	}
 
-	async confirmImport(rows: unknown[]): Promise<{ created: number; errors: string[] }> {
-		return this.request('/import/confirm', {
-			method: 'POST',
-			body: JSON.stringify({ rows })
-		});
+	async getImportRows(importId: number, page: number = 1, pageSize: number = 100): Promise<CSVImportRows> {
+		return this.request(`/import/${importId}/rows?page=${page}&page_size=${pageSize}`);
+	}
+
+	async confirmImport(
+		importId: number,
+		autoCreateCategories: boolean = false
+	): Promise<{ created: number; skipped: number; categories_created: number; errors: string[]; error_count: number; rows_per_second: number }> {
+		return this.request(`/import/${importId}/confirm?auto_create_categories=${autoCreateCategories}`, { method: 'POST' });
+	}
+
+	async discardImport(importId: number): Promise<void> {
+		await this.request(`/import/${importId}`, { method: 'DELETE' });
 	}
 
 	// Banking
@@ -310,7 +322,7 @@ class ApiClient {
 		await this.request(`/banking/connections/${id}`, { method: 'DELETE' });
 	}
 
-	async syncBankConnection(id: number): Promise<{ synced: number; balance: number }> {
+	async syncBankConnection(id: number): Promise<{ synced: number; duplicates: number; balance: number }> {
 		return this.request(`/banking/connections/${id}/sync`, { method: 'POST' });
 	}
 
@@ -318,7 +330,7 @@ class ApiClient {
 		return this.request('/banking/pending');
 	}
 
-	async importPendingTransaction(id: number, categoryId: number): Promise<{ message: string; transaction_id: number }> {
+	async importPendingTransaction(id: number, categoryId: number): Promise<{ message: string; transaction_id: number; duplicate_of_id: number | null }> {
 		return this.request(`/banking/pending/${id}/import`, {
 			method: 'POST',
 			body: JSON.stringify({ category_id: categoryId })
@@ -333,9 +345,32 @@ class ApiClient {
 		return this.request('/banking/pending/import-all', { method: 'POST' });
 	}
 
+	async bulkImportPending(filters: PendingBulkAction): Promise<{ imported: number }> {
+		return this.request('/banking/pending/bulk-import', {
+			method: 'POST',
+			body: JSON.stringify(filters)
+		});
+	}
+
+	async bulkDismissPending(filters: PendingBulkAction): Promise<{ dismissed: number }> {
+		return this.request('/banking/pending/bulk-dismiss', {
+			method: 'POST',
+			body: JSON.stringify(filters)
+		});
+	}
+
 	async getBankBalances(): Promise<BankBalance[]> {
 		return this.request('/banking/balances');
 	}
+
+	async getBalanceHistory(params: { start_date?: string; end_date?: string; connection_id?: number; resolution?: string } = {}): Promise<BalanceHistory> {
+		const query = new URLSearchParams(
+			Object.entries(params)
+				.filter(([, v]) => v !== undefined)
+				.map(([k, v]) => [k, String(v)])
+		);
+		return this.request(`/banking/balances/history?${query}`);
+	}
 }
 
 export const api = new ApiClient();
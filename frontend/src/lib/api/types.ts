@@ -135,9 +135,19 @@ export interface PendingTransaction {
 	suggested_category_id: number | null;
 	suggested_category: Category | null;
 	status: string;
+	duplicate_of_id: number | null;
 	created_at: string;
 }
 
+export interface PendingBulkAction {
+	ids?: number[];
+	merchant_name?: string;
+	bank_connection_id?: number;
+	start_date?: string;
+	end_date?: string;
+	category_id?: number;
+}
+
 export interface BankBalance {
 	bank_connection_id: number;
 	bank_name: string;
@@ -145,3 +155,36 @@ export interface BankBalance {
 	account_type: string;
 	balance: number;
 }
+
+export interface BalanceHistory {
+	resolution: 'raw' | 'daily' | 'monthly';
+	points: { date: string; balance: number }[];
+}
+
+export interface CSVPreviewRow {
+	date: string;
+	amount: number;
+	type: 'income' | 'expense';
+	category: string;
+	description: string | null;
+	duplicate_of: number | null;
+}
+
+export interface CSVPreview {
+	import_id: number;
+	rows: CSVPreviewRow[];
+	errors: string[];
+	duplicates: number;
+	already_imported: number;
+	previous_import_id: number | null;
+	total_rows: number;
+	valid_rows: number;
+	error_count: number;
+}
+
+export interface CSVImportRows {
+	rows: CSVPreviewRow[];
+	page: number;
+	page_size: number;
+	total: number;
+}